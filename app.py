@@ -1,15 +1,44 @@
+import atexit
 import json
+import multiprocessing
 import os
+import sqlite3
 import threading
+import time
 import traceback
 import uuid
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from flask import Flask, jsonify, render_template, request, send_file
-import requests
+from flask import Flask, Response, jsonify, render_template, request, send_file, stream_with_context
 
-from trendyol_search import export_to_excel, search_trendyol
+from http_transport import shared_session
+from job_scheduler import (
+    JOB_EXECUTION_MODE,
+    JobScheduler,
+    ProcessJobRunner,
+    QueueFullError,
+    publish_job_update,
+)
+from job_trace import TRACE_ENABLED, new_job_trace
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, EXPORT_SECONDS, JOBS_FINISHED, REGISTRY as METRICS
+from page_archive import ARCHIVE_ENABLED, PageArchive
+from result_writers import (
+    DEFAULT_RESULT_FORMAT,
+    available_result_formats,
+    open_result_writer,
+    result_extension,
+    result_mimetype,
+)
+from trendyol_search import (
+    DRIVER_POOL_SIZE,
+    LEAN_BROWSER_ENABLED,
+    active_driver_count,
+    close_driver_pools,
+    get_driver_pool,
+    search_trendyol,
+)
 
 app = Flask(__name__)
 app.config["JSON_AS_ASCII"] = False
@@ -22,24 +51,99 @@ DISCORD_WEBHOOK_URL = os.getenv(
     "https://discord.com/api/webhooks/1424874950891933726/_hByuiX4mfxuW0hNLUMj_hX8b_hxJY0a1HTS41WL4OB5eKpOc1HRZndWDy1yCcWlU32G",
 )
 DISCORD_USERNAME = os.getenv("DISCORD_USERNAME", "Trendyol Scraper")
+DRIVER_PREWARM = int(os.getenv("TRENDYOL_DRIVER_PREWARM", str(DRIVER_POOL_SIZE)))
+RESULT_REUSE_SECONDS = float(os.getenv("TRENDYOL_RESULT_REUSE_SECONDS", "600"))
+INCREMENTAL_DEFAULT = os.getenv("TRENDYOL_INCREMENTAL", "0") == "1"
+PROGRESS_STREAM_MIN_INTERVAL = float(os.getenv("TRENDYOL_PROGRESS_STREAM_INTERVAL", "0.5"))
+PROGRESS_STREAM_KEEPALIVE_SECONDS = 15.0
+
+SearchKey = Tuple[str, int, str, bool, bool, bool]
 
 jobs: Dict[str, Dict[str, Any]] = {}
 jobs_lock = threading.Lock()
+# Notified on every job update; progress streams wait on it instead of polling.
+jobs_changed = threading.Condition(jobs_lock)
+jobs_version = 0
+# Search key -> job that is queued or running for it; identical searches attach to that job.
+inflight_searches: Dict[SearchKey, str] = {}
+# Search key -> (job, finish time) of the latest completed scrape, reused for RESULT_REUSE_SECONDS.
+recent_searches: Dict[SearchKey, Tuple[str, float]] = {}
 
 
 def update_job(job_id: str, **fields) -> None:
-    with jobs_lock:
+    global jobs_version
+    with jobs_changed:
         job = jobs.get(job_id)
         if not job:
             return
         job.update(fields)
+        if fields.get("status") in ("completed", "failed"):
+            record_search_finished(job_id, job)
+        jobs_version += 1
+        jobs_changed.notify_all()
+    # Inside a job worker process the web process owns the real job state.
+    publish_job_update(job_id, fields)
+
+
+def apply_job_update(job_id: str, fields: Dict[str, Any]) -> None:
+    update_job(job_id, **fields)
+
+
+def search_key(
+    query: str,
+    max_pages: int,
+    output_format: str,
+    incremental: bool = False,
+    trace: bool = False,
+    archive: bool = False,
+) -> SearchKey:
+    # A job asking for a trace or an archive only attaches to one that produces it, and vice versa.
+    return (" ".join(query.casefold().split()), max_pages, output_format, incremental, trace, archive)
+
+
+def record_search_finished(job_id: str, job: Dict[str, Any]) -> None:
+    # Called with jobs_lock held.
+    key = job.get("search_key")
+    if key is None:
+        return
+    if inflight_searches.get(key) == job_id:
+        del inflight_searches[key]
+    if job.get("status") == "completed" and RESULT_REUSE_SECONDS > 0:
+        recent_searches[key] = (job_id, time.monotonic())
+
+
+def find_shared_search(key: SearchKey) -> Optional[str]:
+    # Called with jobs_lock held.
+    leader_id = inflight_searches.get(key)
+    if leader_id is not None:
+        return leader_id
+    recent = recent_searches.get(key)
+    if recent is None:
+        return None
+    leader_id, finished_at = recent
+    file_path = jobs.get(leader_id, {}).get("file_path")
+    if time.monotonic() - finished_at > RESULT_REUSE_SECONDS or (file_path and not os.path.exists(file_path)):
+        del recent_searches[key]
+        return None
+    return leader_id
 
 
 def build_progress_callback(job_id: str):
+    processing_started: List[float] = []
+
     def _callback(current: int, total: int, stage: str, message: str) -> None:
         percent = 0
         if total:
             percent = max(0, min(100, int(current * 100 / total)))
+        # Products per second since the first processed product, and the time left at that rate.
+        rate = eta_seconds = None
+        if stage == "processing" and current:
+            if not processing_started:
+                processing_started.append(time.monotonic())
+            elapsed = time.monotonic() - processing_started[0]
+            if elapsed > 0 and current > 1:
+                rate = round((current - 1) / elapsed, 2)
+                eta_seconds = round(max(0, total - current) / rate, 1) if rate else None
         update_job(
             job_id,
             current=current,
@@ -47,6 +151,8 @@ def build_progress_callback(job_id: str):
             progress=percent,
             stage=stage,
             message=message,
+            rate=rate,
+            eta_seconds=eta_seconds,
         )
 
     return _callback
@@ -85,6 +191,7 @@ def send_discord_notification(
     status: str,
     message: Optional[str] = None,
     error: Optional[str] = None,
+    row_count: Optional[int] = None,
 ) -> None:
     if not DISCORD_WEBHOOK_URL:
         return
@@ -102,7 +209,7 @@ def send_discord_notification(
         "color": 0x57F287 if status == "completed" else 0xED4245,
         "fields": [
             {"name": "Arama Terimi", "value": query or "(boş)", "inline": False},
-            {"name": "Toplam Satır", "value": str(len(rows)), "inline": True},
+            {"name": "Toplam Satır", "value": str(row_count if row_count is not None else len(rows)), "inline": True},
             {
                 "name": "İstemci IP",
                 "value": client_info.get("ip") or "Bilinmiyor",
@@ -159,23 +266,23 @@ def send_discord_notification(
 
     try:
         if file_path and os.path.exists(file_path):
-            with open(file_path, "rb") as excel_file:
+            with open(file_path, "rb") as result_file:
                 files = {
                     "file": (
                         os.path.basename(file_path),
-                        excel_file,
-                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        result_file,
+                        result_mimetype(file_path),
                     )
                 }
                 data = {"payload_json": json.dumps(payload, ensure_ascii=False)}
-                response = requests.post(
+                response = shared_session().post(
                     DISCORD_WEBHOOK_URL,
                     data=data,
                     files=files,
                     timeout=30,
                 )
         else:
-            response = requests.post(
+            response = shared_session().post(
                 DISCORD_WEBHOOK_URL,
                 json=payload,
                 timeout=30,
@@ -187,44 +294,117 @@ def send_discord_notification(
         app.logger.exception("Discord webhook gönderilirken hata oluştu")
 
 
-def run_search_job(job_id: str, query: str, max_pages: int) -> None:
+def warm_driver_pool() -> None:
+    try:
+        started = get_driver_pool(headless=True).warm(DRIVER_PREWARM)
+        app.logger.info("%s tarayıcı önceden başlatıldı", started)
+    except Exception:  # pylint: disable=broad-except
+        app.logger.exception("Tarayıcı havuzu ısıtılırken hata oluştu")
+
+
+def save_job_trace(job_id: str, trace: Any) -> None:
+    if not trace.enabled:
+        return
+    trace_path = os.path.join(OUTPUT_DIR, f"trendyol_trace_{job_id}.json")
+    try:
+        trace.save(trace_path)
+    except OSError:
+        app.logger.exception("İş izi kaydedilemedi: %s", job_id)
+        return
+    update_job(job_id, trace_path=trace_path)
+
+
+def open_job_archive(job_id: str) -> Optional[PageArchive]:
+    with jobs_lock:
+        if not jobs.get(job_id, {}).get("archive"):
+            return None
+    archive_path = os.path.join(OUTPUT_DIR, f"trendyol_archive_{job_id}.sqlite3")
+    try:
+        archive = PageArchive(archive_path)
+    except (OSError, sqlite3.Error):
+        app.logger.exception("Sayfa arşivi açılamadı: %s", job_id)
+        return None
+    update_job(job_id, archive_path=archive_path)
+    return archive
+
+
+def run_search_job(
+    job_id: str,
+    query: str,
+    max_pages: int,
+    output_format: str = DEFAULT_RESULT_FORMAT,
+    incremental: bool = False,
+) -> None:
     update_job(job_id, status="running", message="Arama başlatıldı", stage="initializing")
+    file_path = os.path.join(OUTPUT_DIR, f"trendyol_products_{job_id}{result_extension(output_format)}")
+    with jobs_lock:
+        trace = new_job_trace(bool(jobs.get(job_id, {}).get("trace")), name=f"trendyol search {job_id}")
+    sample_rows: List[Dict[str, Any]] = []
+    writer = None
+    export_seconds = [0.0]
     try:
-        rows = search_trendyol(
-            query,
-            headless=True,
-            progress_callback=build_progress_callback(job_id),
-            max_pages=max_pages,
-        )
-        file_path = None
-        if rows:
-            file_path = os.path.join(OUTPUT_DIR, f"trendyol_products_{job_id}.xlsx")
-            export_to_excel(rows, output_path=file_path)
+        writer = open_result_writer(output_format, file_path)
+        archive = open_job_archive(job_id)
+
+        def write_row(row: Dict[str, Any]) -> None:
+            started = time.perf_counter()
+            writer.write(row)
+            export_seconds[0] += time.perf_counter() - started
+            if len(sample_rows) < 5:
+                sample_rows.append(row)
+
+        try:
+            search_trendyol(
+                query,
+                headless=True,
+                progress_callback=build_progress_callback(job_id),
+                max_pages=max_pages,
+                row_sink=write_row,
+                incremental=incremental,
+                trace=trace,
+                archive=archive,
+            )
+        finally:
+            started = time.perf_counter()
+            with trace.span("export close", "export", format=output_format, rows=writer.rows_written):
+                writer.close()
+            export_seconds[0] += time.perf_counter() - started
+            EXPORT_SECONDS.observe(export_seconds[0], format=output_format)
+            save_job_trace(job_id, trace)
+            if archive is not None:
+                archive.close()
+        row_count = writer.rows_written
+        if row_count:
             update_job(
                 job_id,
                 status="completed",
                 progress=100,
-                message=f"{len(rows)} satır başarıyla kaydedildi.",
+                message=f"{row_count} satır başarıyla kaydedildi.",
                 stage="completed",
                 file_path=file_path,
             )
+            JOBS_FINISHED.inc(status="completed")
             send_discord_notification(
                 job_id,
                 query,
-                rows,
+                sample_rows,
                 file_path,
                 status="completed",
-                message=f"{len(rows)} satır başarıyla kaydedildi.",
+                message=f"{row_count} satır başarıyla kaydedildi.",
+                row_count=row_count,
             )
         else:
+            if os.path.exists(file_path):
+                os.remove(file_path)
             update_job(
                 job_id,
                 status="completed",
                 progress=100,
                 message="Ürün bulunamadı.",
                 stage="completed",
-                file_path=file_path,
+                file_path=None,
             )
+            JOBS_FINISHED.inc(status="completed")
             send_discord_notification(
                 job_id,
                 query,
@@ -235,6 +415,8 @@ def run_search_job(job_id: str, query: str, max_pages: int) -> None:
             )
     except Exception as exc:  # pylint: disable=broad-except
         traceback.print_exc()
+        # Rows written before the failure stay on disk as a partial result.
+        partial_path = file_path if writer is not None and writer.rows_written else None
         update_job(
             job_id,
             status="failed",
@@ -242,7 +424,9 @@ def run_search_job(job_id: str, query: str, max_pages: int) -> None:
             message=str(exc),
             stage="failed",
             error=str(exc),
+            file_path=partial_path,
         )
+        JOBS_FINISHED.inc(status="failed")
         send_discord_notification(
             job_id,
             query,
@@ -254,9 +438,70 @@ def run_search_job(job_id: str, query: str, max_pages: int) -> None:
         )
 
 
+def run_search_job_in_worker(
+    job_id: str,
+    job_snapshot: Dict[str, Any],
+    query: str,
+    max_pages: int,
+    output_format: str,
+    incremental: bool = False,
+) -> Dict[str, Any]:
+    with jobs_lock:
+        jobs[job_id] = job_snapshot
+    try:
+        run_search_job(job_id, query, max_pages, output_format, incremental)
+    finally:
+        with jobs_lock:
+            jobs.pop(job_id, None)
+    # Metrics recorded in this process go back to the web process, which serves /metrics.
+    return METRICS.drain()
+
+
+def run_search_job_in_process(
+    job_id: str,
+    query: str,
+    max_pages: int,
+    output_format: str = DEFAULT_RESULT_FORMAT,
+    incremental: bool = False,
+) -> None:
+    with jobs_lock:
+        job_snapshot = dict(jobs.get(job_id, {}))
+    try:
+        METRICS.merge(job_process_runner.run(job_id, job_snapshot, query, max_pages, output_format, incremental))
+    except BrokenProcessPool:
+        app.logger.error("İş süreci beklenmedik şekilde sonlandı: %s", job_id)
+        update_job(
+            job_id,
+            status="failed",
+            progress=100,
+            message="İş süreci beklenmedik şekilde sonlandı.",
+            stage="failed",
+            error="İş süreci beklenmedik şekilde sonlandı.",
+        )
+        JOBS_FINISHED.inc(status="failed")
+
+
+job_process_runner: Optional[ProcessJobRunner] = None
+# Worker processes import this module too; only the web process owns the pool and the scheduler's runner.
+if JOB_EXECUTION_MODE == "process" and multiprocessing.parent_process() is None:
+    job_process_runner = ProcessJobRunner(
+        run_search_job_in_worker, apply_job_update, finalizer=close_driver_pools
+    )
+    job_scheduler = JobScheduler(run_search_job_in_process)
+else:
+    job_scheduler = JobScheduler(run_search_job)
+
+METRICS.gauge("trendyol_job_queue_depth", "Search jobs waiting for a worker.", lambda: job_scheduler.stats()["queued"])
+METRICS.gauge("trendyol_jobs_running", "Search jobs currently running.", lambda: job_scheduler.stats()["running"])
+METRICS.gauge("trendyol_active_drivers", "Chrome drivers leased in this process.", active_driver_count)
+METRICS.gauge(
+    "trendyol_lean_browser", "1 when Chrome runs with the lean, resource-blocking profile.", lambda: int(LEAN_BROWSER_ENABLED)
+)
+
+
 @app.route("/")
 def index() -> str:
-    return render_template("index.html")
+    return render_template("index.html", output_formats=available_result_formats())
 
 
 @app.route("/api/search", methods=["POST"])
@@ -278,10 +523,18 @@ def start_search():
         return jsonify({"error": "Sayfa sayısı sayı olarak gönderilmelidir."}), 400
     if max_pages < 1 or max_pages > 50:
         return jsonify({"error": "Sayfa sayısı 1 ile 50 arasında olmalıdır."}), 400
+    output_format = str(data.get("output_format") or DEFAULT_RESULT_FORMAT).strip().lower()
+    if output_format not in available_result_formats():
+        return jsonify({"error": "Desteklenmeyen çıktı biçimi."}), 400
+    incremental = bool(data.get("incremental", INCREMENTAL_DEFAULT))
+    trace_enabled = bool(data.get("trace", TRACE_ENABLED))
+    archive_enabled = bool(data.get("archive", ARCHIVE_ENABLED))
 
     job_id = uuid.uuid4().hex
     client_info = extract_client_info(request)
+    key = search_key(query, max_pages, output_format, incremental, trace_enabled, archive_enabled)
     with jobs_lock:
+        shared_job_id = find_shared_search(key)
         jobs[job_id] = {
             "id": job_id,
             "query": query,
@@ -296,20 +549,41 @@ def start_search():
             "client_info": client_info,
             "visitor_name": visitor_name,
             "max_pages": max_pages,
+            "output_format": output_format,
+            "incremental": incremental,
+            "trace": trace_enabled,
+            "archive": archive_enabled,
+            "search_key": key,
         }
+        if shared_job_id is not None:
+            # Same query, page limit, format and options as a running or recently completed job: share its scrape.
+            jobs[job_id]["shared_job_id"] = shared_job_id
+            return jsonify({"job_id": job_id, "shared": True})
+        inflight_searches[key] = job_id
 
-    thread = threading.Thread(target=run_search_job, args=(job_id, query, max_pages), daemon=True)
-    thread.start()
+    try:
+        position = job_scheduler.submit(job_id, visitor_name, query, max_pages, output_format, incremental)
+    except QueueFullError as exc:
+        with jobs_lock:
+            jobs.pop(job_id, None)
+            if inflight_searches.get(key) == job_id:
+                del inflight_searches[key]
+        response = jsonify(
+            {"error": "Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.", "retry_after": exc.retry_after}
+        )
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response, 429
 
-    return jsonify({"job_id": job_id})
+    return jsonify({"job_id": job_id, "queue_position": position})
 
 
-@app.route("/api/progress/<job_id>")
-def get_progress(job_id: str):
+def build_progress_snapshot(job_id: str) -> Optional[Dict[str, Any]]:
     with jobs_lock:
         job = jobs.get(job_id)
         if not job:
-            return jsonify({"error": "İş bulunamadı."}), 404
+            return None
+        # Coalesced jobs report the state and output of the job whose scrape they share.
+        job = jobs.get(job.get("shared_job_id"), job)
         response = {
             "job_id": job_id,
             "status": job.get("status"),
@@ -318,18 +592,112 @@ def get_progress(job_id: str):
             "stage": job.get("stage"),
             "current": job.get("current", 0),
             "total": job.get("total", 0),
+            "rate": job.get("rate"),
+            "eta_seconds": job.get("eta_seconds"),
             "error": job.get("error"),
         }
-        if job.get("status") == "completed" and job.get("file_path"):
+        if job.get("file_path"):
             response["download_url"] = f"/download/{job_id}"
-        return jsonify(response)
+            response["file_name"] = os.path.basename(job["file_path"])
+            response["partial"] = job.get("status") == "failed"
+        if job.get("trace_path"):
+            response["trace_url"] = f"/api/jobs/{job_id}/trace"
+        if job.get("archive_path") and job.get("status") in ("completed", "failed"):
+            response["archive_url"] = f"/api/jobs/{job_id}/archive"
+        scheduled_job_id = job["id"]
+    if scheduled_job_id != job_id:
+        response["shared"] = True
+    if response["status"] == "queued":
+        position = job_scheduler.position(scheduled_job_id)
+        if position is not None:
+            eta_seconds = job_scheduler.estimated_wait(position)
+            response["queue_position"] = position
+            response["eta_seconds"] = eta_seconds
+            response["message"] = f"Sırada {position}. iş (tahmini bekleme ~{max(1, round(eta_seconds / 60))} dk)."
+    return response
+
+
+@app.route("/api/progress/<job_id>")
+def get_progress(job_id: str):
+    response = build_progress_snapshot(job_id)
+    if response is None:
+        return jsonify({"error": "İş bulunamadı."}), 404
+    return jsonify(response)
+
+
+@app.route("/api/progress/<job_id>/stream")
+def stream_progress(job_id: str):
+    if build_progress_snapshot(job_id) is None:
+        return jsonify({"error": "İş bulunamadı."}), 404
+
+    def generate():
+        seen_version = -1
+        last_payload = None
+        while True:
+            with jobs_changed:
+                changed = jobs_changed.wait_for(
+                    lambda: jobs_version != seen_version, timeout=PROGRESS_STREAM_KEEPALIVE_SECONDS
+                )
+                seen_version = jobs_version
+            snapshot = build_progress_snapshot(job_id)
+            if snapshot is None:
+                return
+            payload = json.dumps(snapshot, ensure_ascii=False)
+            if payload != last_payload:
+                last_payload = payload
+                yield f"data: {payload}\n\n"
+            elif not changed:
+                yield ": keep-alive\n\n"
+            if snapshot["status"] in ("completed", "failed"):
+                return
+            # Updates arriving in the meantime are folded into the next event.
+            time.sleep(PROGRESS_STREAM_MIN_INTERVAL)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/metrics")
+def metrics():
+    return Response(METRICS.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+@app.route("/api/jobs/<job_id>/trace")
+def download_trace(job_id: str):
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job:
+            job = jobs.get(job.get("shared_job_id"), job)
+        trace_path = job.get("trace_path") if job else None
+    if not isinstance(trace_path, str) or not os.path.exists(trace_path):
+        return jsonify({"error": "Bu iş için zamanlama izi bulunamadı."}), 404
+    return send_file(trace_path, mimetype="application/json", as_attachment=True)
+
+
+@app.route("/api/jobs/<job_id>/archive")
+def download_archive(job_id: str):
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job:
+            job = jobs.get(job.get("shared_job_id"), job)
+        if not job or job.get("status") not in ("completed", "failed"):
+            return jsonify({"error": "Bu iş için sayfa arşivi bulunamadı."}), 404
+        archive_path = job.get("archive_path")
+    if not isinstance(archive_path, str) or not os.path.exists(archive_path):
+        return jsonify({"error": "Bu iş için sayfa arşivi bulunamadı."}), 404
+    return send_file(archive_path, mimetype="application/vnd.sqlite3", as_attachment=True)
 
 
 @app.route("/download/<job_id>")
 def download_file(job_id: str):
     with jobs_lock:
         job = jobs.get(job_id)
-        if not job or job.get("status") != "completed" or not job.get("file_path"):
+        if job:
+            job = jobs.get(job.get("shared_job_id"), job)
+        if not job or job.get("status") not in ("completed", "failed") or not job.get("file_path"):
             return jsonify({"error": "Dosya bulunamadı veya işlem tamamlanmadı."}), 404
         file_path = job.get("file_path")
     if not isinstance(file_path, str) or not os.path.exists(file_path):
@@ -338,4 +706,9 @@ def download_file(job_id: str):
 
 
 if __name__ == "__main__":
+    atexit.register(close_driver_pools)
+    if job_process_runner is not None:
+        atexit.register(job_process_runner.shutdown)
+    else:
+        threading.Thread(target=warm_driver_pool, daemon=True).start()
     app.run(host="0.0.0.0", port=26888, debug=False)
@@ -0,0 +1,359 @@
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import resource
+except ImportError:  # Windows; peak RSS falls back to psutil if it is installed
+    resource = None
+
+DETAIL_PROPS_NAME = "__envoy_flash-sales-banner__PROPS"
+SELLER_PROPS_NAME = "__envoy_seller-storefront-web__PROPS"
+SEARCH_STATE_MARKER = "window.__SEARCH_APP_INITIAL_STATE__"
+PRODUCT_PATH_RE = re.compile(r"-p-(\d+)")
+SELLER_PATH_RE = re.compile(r"-m-(\d+)")
+
+
+class StandInSite:
+    """Serves search, product and storefront pages shaped like Trendyol's, synthetic or recorded."""
+
+    def __init__(
+        self,
+        pages: int,
+        page_size: int,
+        sellers: int,
+        other_merchants: int,
+        latency_ms: float,
+        jitter_ms: float,
+        error_rate: float,
+        seed: int,
+        product_page: Optional[str] = None,
+        seller_page: Optional[str] = None,
+    ) -> None:
+        self.pages = pages
+        self.page_size = page_size
+        self.sellers = max(1, sellers)
+        self.other_merchants = other_merchants
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._product_template = self._read(product_page)
+        self._seller_template = self._read(seller_page)
+        self.requests = 0
+        self.errors = 0
+
+    @staticmethod
+    def _read(path: Optional[str]) -> Optional[str]:
+        if not path:
+            return None
+        with open(path, encoding="utf-8") as page_file:
+            return page_file.read()
+
+    def delay_and_fail(self) -> bool:
+        with self._random_lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+            self.requests += 1
+            self.errors += int(failed)
+        time.sleep(delay)
+        return failed
+
+    def product_ids(self, page: int) -> List[int]:
+        if page < 1 or page > self.pages:
+            return []
+        return [page * 100000 + index for index in range(self.page_size)]
+
+    def search_page(self, page: int) -> str:
+        items = []
+        cards = []
+        for product_id in self.product_ids(page):
+            url = f"/benchmark/urun-{product_id}-p-{product_id}"
+            price = f"{100 + product_id % 900},99 TL"
+            items.append(
+                {
+                    "id": product_id,
+                    "url": url,
+                    "name": f"Ürün {product_id}",
+                    "images": [f"/ty/{product_id}.jpg"],
+                    "price": {"sellingPrice": price},
+                }
+            )
+            cards.append(
+                f'<div class="p-card-wrppr"><a href="{url}"><img src="/ty/{product_id}.jpg">'
+                f'<span class="prdct-desc-cntnr-name">Ürün {product_id}</span></a>'
+                f'<div class="prc-box-dscntd">{price}</div></div>'
+            )
+        state = json.dumps({"products": items}, ensure_ascii=False)
+        return (
+            f"<html><head><script>{SEARCH_STATE_MARKER}={state};</script></head>"
+            f"<body><div class=\"prdct-cntnr-wrppr\">{''.join(cards)}</div></body></html>"
+        )
+
+    def _merchant(self, merchant_id: int, primary: bool) -> Dict[str, Any]:
+        merchant = {"id": merchant_id, "name": f"Mağaza {merchant_id}"}
+        price = {"discountedPrice": {"text": f"{merchant_id},00 TL", "value": float(merchant_id)}, "currency": "TRY"}
+        variant = {"listingId": f"L{merchant_id}", "quantity": 5, "fulfilmentType": "MP", "price": price}
+        if primary:
+            return {"merchant": merchant, "winnerVariant": variant}
+        merchant.update({"variants": [variant], "url": f"/magaza/magaza-{merchant_id}-m-{merchant_id}"})
+        return merchant
+
+    def product_page(self, product_id: int) -> str:
+        if self._product_template is not None:
+            return self._product_template
+        listing = self._merchant(1000 + product_id % self.sellers, primary=True)
+        listing["otherMerchants"] = [
+            self._merchant(1000 + (product_id + offset) % self.sellers, primary=False)
+            for offset in range(1, self.other_merchants + 1)
+        ]
+        props = {
+            "product": {
+                "productCode": f"PC{product_id}",
+                "category": {"name": "Benchmark", "hierarchy": "Benchmark/Ürünler"},
+                "brand": {"name": "Marka"},
+                "images": [f"/ty/{product_id}_{index}.jpg" for index in range(4)],
+                "merchantListing": listing,
+            }
+        }
+        # Real product pages are large; pad so parsing cost is in the same range.
+        padding = "<div class=\"filler\">" + ("x" * 200 + "</div><div class=\"filler\">") * 300 + "</div>"
+        return (
+            f"<html><body>{padding}<script>window[\"{DETAIL_PROPS_NAME}\"]="
+            f"{json.dumps(props, ensure_ascii=False)}</script></body></html>"
+        )
+
+    def seller_page(self, merchant_id: int) -> str:
+        if self._seller_template is not None:
+            return self._seller_template
+        props = {
+            "seller": {
+                "corporateInfo": {
+                    "officialName": f"Mağaza {merchant_id} Ltd. Şti.",
+                    "cityName": "İstanbul",
+                    "registeredEmail": f"magaza{merchant_id}@example.com",
+                    "taxNumber": str(1000000000 + merchant_id),
+                }
+            }
+        }
+        return f"<html><body><script>window[\"{SELLER_PROPS_NAME}\"]={json.dumps(props)}</script></body></html>"
+
+    def render(self, path: str) -> Optional[str]:
+        parsed = urlparse(path)
+        if parsed.path == "/sr":
+            page = int((parse_qs(parsed.query).get("pi") or ["1"])[0])
+            return self.search_page(page)
+        seller_match = SELLER_PATH_RE.search(parsed.path)
+        if parsed.path.startswith("/magaza/") and seller_match:
+            return self.seller_page(int(seller_match.group(1)))
+        product_match = PRODUCT_PATH_RE.search(parsed.path)
+        if product_match:
+            return self.product_page(int(product_match.group(1)))
+        return None
+
+
+def serve(site: StandInSite) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path.startswith("/ty/"):
+                self._send(404, b"")
+                return
+            if site.delay_and_fail():
+                self._send(503, b"unavailable")
+                return
+            body = site.render(self.path)
+            if body is None:
+                self._send(404, b"not found")
+                return
+            self._send(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+        def _send(self, status: int, body: bytes, content_type: str = "text/plain") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stand-in-server", daemon=True).start()
+    return server
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is not None:
+        # ru_maxrss is KiB on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+
+
+def run_once(args: argparse.Namespace) -> Dict[str, Any]:
+    # Runs in a child process whose environment already points trendyol_search at the stand-in server.
+    from trendyol_search import close_driver_pools, export_to_excel, search_trendyol
+
+    rows: List[Any] = []
+    first_row: List[float] = []
+    started_cpu = os.times()
+    started = time.perf_counter()
+
+    def collect(row: Any) -> None:
+        if not first_row:
+            first_row.append(time.perf_counter() - started)
+        rows.append(row)
+
+    try:
+        search_trendyol(
+            "benchmark",
+            headless=True,
+            max_pages=args.max_pages or args.pages,
+            detail_concurrency=args.detail_concurrency,
+            row_sink=collect,
+        )
+        search_seconds = time.perf_counter() - started
+        export_seconds = None
+        if not args.no_export:
+            with tempfile.TemporaryDirectory() as export_dir:
+                export_started = time.perf_counter()
+                export_to_excel(rows, os.path.join(export_dir, "benchmark.xlsx"))
+                export_seconds = time.perf_counter() - export_started
+    finally:
+        close_driver_pools()
+    cpu = os.times()
+    product_ids = {row["Product ID"] for row in rows}
+    return {
+        "products": len(product_ids),
+        "rows": len(rows),
+        "search_seconds": round(search_seconds, 3),
+        "products_per_second": round(len(product_ids) / search_seconds, 2) if search_seconds else None,
+        "first_row_seconds": round(first_row[0], 3) if first_row else None,
+        "export_seconds": round(export_seconds, 3) if export_seconds is not None else None,
+        "cpu_seconds": round((cpu.user - started_cpu.user) + (cpu.system - started_cpu.system), 2),
+        "child_cpu_seconds": round(
+            (cpu.children_user - started_cpu.children_user) + (cpu.children_system - started_cpu.children_system), 2
+        ),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_mode(mode: str, base_url: str, args: argparse.Namespace, passthrough: List[str]) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ)
+        env.update(
+            {
+                "TRENDYOL_BASE_URL": base_url,
+                "TRENDYOL_HTTP_SEARCH": "1" if mode == "http" else "0",
+                # browser-full is the browser mode with images, CSS, fonts and trackers loaded.
+                "TRENDYOL_LEAN_BROWSER": "0" if mode == "browser-full" else "1",
+                # A fresh cache directory per run so no run benefits from an earlier one.
+                "TRENDYOL_CACHE_DIR": cache_dir,
+                "TRENDYOL_PAGE_CACHE": "0",
+            }
+        )
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", *passthrough],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    if completed.returncode != 0:
+        return {"error": (completed.stderr or completed.stdout).strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_report(results: Dict[str, Dict[str, Any]], site: StandInSite) -> None:
+    labels = [
+        ("products", "ürün"),
+        ("rows", "satır"),
+        ("search_seconds", "arama süresi (sn)"),
+        ("products_per_second", "ürün/sn"),
+        ("first_row_seconds", "ilk satır (sn)"),
+        ("export_seconds", "Excel yazma (sn)"),
+        ("cpu_seconds", "CPU (sn)"),
+        ("child_cpu_seconds", "alt süreç CPU (sn)"),
+        ("peak_rss_mb", "en yüksek RSS (MB)"),
+    ]
+    modes = list(results)
+    print(f"{'':<22}" + "".join(f"{mode:>14}" for mode in modes))
+    for key, label in labels:
+        values = [results[mode].get(key) for mode in modes]
+        print(f"{label:<22}" + "".join(f"{'-' if value is None else value:>14}" for value in values))
+    for mode, result in results.items():
+        if "error" in result:
+            print(f"{mode}: hata: {' '.join(result['error'])}")
+    print(f"Sunucu: {site.requests} istek, {site.errors} hata yanıtı")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="search_trendyol ve export_to_excel'i yerel bir Trendyol benzeri sunucuya karşı ölçer."
+    )
+    parser.add_argument("--modes", default="http", help="Virgülle ayrılmış: http, browser, browser-full")
+    parser.add_argument("--pages", type=int, default=3, help="Sonuç içeren arama sayfası sayısı")
+    parser.add_argument("--page-size", type=int, default=24)
+    parser.add_argument("--max-pages", type=int, default=0, help="search_trendyol sayfa sınırı (0: --pages değeri)")
+    parser.add_argument("--detail-concurrency", type=int, default=None)
+    parser.add_argument("--sellers", type=int, default=20, help="Farklı satıcı sayısı")
+    parser.add_argument("--other-merchants", type=int, default=2, help="Ürün başına diğer satıcı sayısı")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 dönen isteklerin oranı (0-1)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--product-page", help="Tüm ürünler için sunulacak kaydedilmiş ürün sayfası")
+    parser.add_argument("--seller-page", help="Tüm satıcılar için sunulacak kaydedilmiş mağaza sayfası")
+    parser.add_argument("--no-export", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args, _ = parser.parse_known_args()
+
+    if args.child:
+        print(json.dumps(run_once(args)))
+        return
+
+    site = StandInSite(
+        pages=args.pages,
+        page_size=args.page_size,
+        sellers=args.sellers,
+        other_merchants=args.other_merchants,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        product_page=args.product_page,
+        seller_page=args.seller_page,
+    )
+    server = serve(site)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    passthrough = [arg for arg in sys.argv[1:] if arg != "--child"]
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for mode in [mode.strip() for mode in args.modes.split(",") if mode.strip()]:
+            print(f"{mode} çalıştırılıyor...", flush=True)
+            results[mode] = run_mode(mode, base_url, args, passthrough)
+    finally:
+        server.shutdown()
+    print_report(results, site)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from trendyol_search import (
+    BASE_URL,
+    DETAIL_PROPS_NAME,
+    DETAIL_SCRIPT_PATTERN,
+    SELLER_PROPS_NAMES,
+    SELLER_PROPS_PATTERNS,
+    collect_products_from_html,
+    extract_envoy_props,
+    extract_props_json,
+    lxml_html,
+    orjson,
+    parse_product_detail,
+)
+
+
+def legacy_collect_products_from_cards(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    # The card parser as it was before the fast path, kept here so the baseline does not move with it.
+    products: List[Dict[str, Any]] = []
+    seen_ids = set()
+    for card in soup.select("div.p-card-wrppr"):
+        link_elem = card.find("a", href=True)
+        if not link_elem:
+            continue
+        url_path = link_elem["href"]
+        url_full = url_path if url_path.startswith("http") else f"{BASE_URL}{url_path}"
+        product_id_match = re.search(r"p-(\d+)", url_full)
+        product_id = product_id_match.group(1) if product_id_match else None
+        if not product_id or product_id in seen_ids:
+            continue
+        seen_ids.add(product_id)
+        name_elem = card.find("span", class_=re.compile(r"prdct-desc-cntnr-name"))
+        product_name = name_elem.get_text(strip=True) if name_elem else link_elem.get_text(strip=True)
+        image_elem = card.find("img")
+        image_url = image_elem.get("data-src") or image_elem.get("src") if image_elem else None
+        boutique_match = re.search(r"boutiqueId=(\d+)", url_full)
+        category_id = boutique_match.group(1) if boutique_match else "N/A"
+        products.append(
+            {
+                "product_id": product_id,
+                "product_name": product_name,
+                "product_url": url_full,
+                "category_id": category_id,
+                "image_url": image_url,
+            }
+        )
+    return products
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - started) * 1000 / repeat
+
+
+def benchmark_page(path: str, repeat: int) -> None:
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+
+    def legacy_all() -> None:
+        extract_props_json(html, DETAIL_SCRIPT_PATTERN)
+        for pattern in SELLER_PROPS_PATTERNS:
+            extract_props_json(html, pattern)
+
+    timings = {
+        "regex detail": measure(lambda: extract_props_json(html, DETAIL_SCRIPT_PATTERN), repeat),
+        "scan detail": measure(lambda: extract_envoy_props(html, [DETAIL_PROPS_NAME]), repeat),
+        "regex detail+seller": measure(legacy_all, repeat),
+        "scan detail+seller": measure(
+            lambda: extract_envoy_props(html, [DETAIL_PROPS_NAME, *SELLER_PROPS_NAMES]), repeat
+        ),
+        "parse_product_detail": measure(lambda: parse_product_detail(html), repeat),
+    }
+    print(f"{path} ({len(html) / 1024:.0f} KB)")
+    for label, value in timings.items():
+        print(f"  {label:<22} {value:8.2f} ms CPU/sayfa")
+
+
+def benchmark_results_page(path: str, repeat: int) -> bool:
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+
+    def legacy() -> list:
+        return legacy_collect_products_from_cards(BeautifulSoup(html, "html.parser"))
+
+    def fast() -> list:
+        return collect_products_from_html(html)
+
+    # The legacy parser predates card prices, so the comparison covers the fields it produces.
+    fast_rows = [{key: value for key, value in row.items() if key != "card_price"} for row in fast()]
+    same = legacy() == fast_rows
+    print(f"{path} ({len(html) / 1024:.0f} KB, {len(fast_rows)} ürün, çıktı {'aynı' if same else 'FARKLI'})")
+    print(f"  {'BeautifulSoup kartlar':<22} {measure(legacy, repeat):8.2f} ms CPU/sayfa")
+    print(f"  {'hızlı kartlar':<22} {measure(fast, repeat):8.2f} ms CPU/sayfa")
+    return same
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ürün ve arama sayfası ayrıştırıcılarının CPU süresini ölçer.")
+    parser.add_argument("pages", nargs="*", default=[], help="Kaydedilmiş ürün sayfaları")
+    parser.add_argument("--results", nargs="*", default=[], help="Kaydedilmiş arama sonuç sayfaları")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"JSON arka ucu: {'orjson' if orjson is not None else 'json'}")
+    print(f"Kart ayrıştırıcı: {'lxml' if lxml_html is not None else 'html.parser'}")
+    paths: List[str] = args.pages or ([] if args.results else ["sample.html"])
+    for path in paths:
+        benchmark_page(path, max(1, args.repeat))
+    mismatched = [path for path in args.results if not benchmark_results_page(path, max(1, args.repeat))]
+    if mismatched:
+        sys.exit(f"Hızlı kart ayrıştırıcının çıktısı farklı: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
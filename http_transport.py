@@ -0,0 +1,166 @@
+import os
+import random
+import threading
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import HTTP_RECEIVED_BYTES, HTTP_RETRY_ATTEMPTS
+
+try:
+    import brotli  # urllib3 decodes "br" responses whenever a brotli package is importable
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+HTTP_POOL_SIZE = int(os.getenv("TRENDYOL_HTTP_POOL_SIZE", "32"))
+# "host=size" pairs, e.g. "discord.com=2,cdn.dsmcdn.com=8"; other hosts get HTTP_POOL_SIZE.
+HTTP_HOST_POOL_SIZES = os.getenv("TRENDYOL_HTTP_HOST_POOL_SIZES", "")
+HTTP_RETRIES = int(os.getenv("TRENDYOL_HTTP_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("TRENDYOL_HTTP_BACKOFF_SECONDS", "0.3"))
+# Longest Retry-After a retry waits out inside the pool; longer pauses are the rate limiter's job.
+HTTP_MAX_RETRY_AFTER_SECONDS = float(os.getenv("TRENDYOL_HTTP_MAX_RETRY_AFTER_SECONDS", "5"))
+RETRY_STATUSES = (500, 502, 503, 504)
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+
+
+def parse_host_pool_sizes(value: str) -> Dict[str, int]:
+    sizes: Dict[str, int] = {}
+    for entry in value.split(","):
+        host, _, size = entry.partition("=")
+        if host.strip() and size.strip().isdigit():
+            sizes[host.strip().lower()] = max(1, int(size))
+    return sizes
+
+
+class JitteredRetry(Retry):
+    """urllib3 Retry with full jitter on the backoff, so parallel workers do not retry in lockstep."""
+
+    def get_backoff_time(self) -> float:
+        return random.uniform(0, super().get_backoff_time())
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, HTTP_MAX_RETRY_AFTER_SECONDS)
+
+    def increment(self, method: Optional[str] = None, url: Optional[str] = None, *args: Any, **kwargs: Any) -> Retry:
+        response = kwargs.get("response")
+        error = kwargs.get("error")
+        if response is not None and response.status in RETRY_STATUSES:
+            reason = "status"
+        elif error is not None and self._is_connection_error(error):
+            reason = "connect"
+        else:
+            reason = "read"
+        retry = super().increment(method, url, *args, **kwargs)
+        HTTP_RETRY_ATTEMPTS.inc(reason=reason)
+        return retry
+
+
+def build_retry(total: int = HTTP_RETRIES) -> Retry:
+    # Connect errors are retried for any method (nothing was sent); 5xx only for idempotent ones.
+    # 429 is left to the caller: it means slow down, not try again right away.
+    return JitteredRetry(
+        total=total,
+        connect=total,
+        read=0,
+        status=total,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        backoff_factor=HTTP_BACKOFF_SECONDS,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+def count_received_bytes(response: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+    if kwargs.get("stream"):
+        return response
+    host = urlsplit(response.url).hostname or ""
+    decoded = len(response.content)
+    try:
+        wire = int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        wire = decoded
+    HTTP_RECEIVED_BYTES.inc(wire or decoded, host=host, form="wire")
+    HTTP_RECEIVED_BYTES.inc(decoded, host=host, form="decoded")
+    return response
+
+
+class HttpTransport:
+    """Connection pools shared by every session in the process, so keep-alive outlives a single job."""
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        host_pool_sizes: Optional[Mapping[str, int]] = None,
+        retries: int = HTTP_RETRIES,
+    ) -> None:
+        self.pool_size = max(1, pool_size)
+        self.host_pool_sizes = dict(
+            parse_host_pool_sizes(HTTP_HOST_POOL_SIZES) if host_pool_sizes is None else host_pool_sizes
+        )
+        self._retries = retries
+        self._default_adapter = self._new_adapter(self.pool_size)
+        self._host_adapters = {host: self._new_adapter(size) for host, size in self.host_pool_sizes.items()}
+
+    def _new_adapter(self, pool_size: int) -> HTTPAdapter:
+        return HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=build_retry(self._retries))
+
+    def new_session(self, headers: Optional[Mapping[str, str]] = None) -> requests.Session:
+        # Cookies and headers stay per session; the pooled connections underneath are shared.
+        session = requests.Session()
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        if headers:
+            session.headers.update(headers)
+        session.hooks["response"].append(count_received_bytes)
+        for scheme in ("https://", "http://"):
+            session.mount(scheme, self._default_adapter)
+            for host, adapter in self._host_adapters.items():
+                session.mount(f"{scheme}{host}", adapter)
+        return session
+
+    def close(self) -> None:
+        self._default_adapter.close()
+        for adapter in self._host_adapters.values():
+            adapter.close()
+
+
+_transport: Optional[HttpTransport] = None
+_shared_session: Optional[requests.Session] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+        return _transport
+
+
+def new_session(headers: Optional[Mapping[str, str]] = None) -> requests.Session:
+    return get_transport().new_session(headers)
+
+
+def shared_session() -> requests.Session:
+    """One session for callers that keep no cookies, such as webhook notifications."""
+    global _shared_session
+    transport = get_transport()
+    with _transport_lock:
+        if _shared_session is None:
+            _shared_session = transport.new_session()
+        return _shared_session
+
+
+def close_transport() -> None:
+    global _transport, _shared_session
+    with _transport_lock:
+        transport, _transport, _shared_session = _transport, None, None
+    if transport is not None:
+        transport.close()
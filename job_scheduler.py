@@ -0,0 +1,255 @@
+import math
+import multiprocessing
+import multiprocessing.util
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+JOB_WORKERS = int(os.getenv("TRENDYOL_JOB_WORKERS", os.getenv("TRENDYOL_DRIVER_POOL_SIZE", "2")))
+JOB_QUEUE_SIZE = int(os.getenv("TRENDYOL_JOB_QUEUE_SIZE", "20"))
+JOB_ESTIMATE_SECONDS = float(os.getenv("TRENDYOL_JOB_ESTIMATE_SECONDS", "120"))
+JOB_DURATION_HISTORY = 20
+# "thread" runs jobs inside the web process; "process" runs them in a pool of worker processes.
+JOB_EXECUTION_MODE = os.getenv("TRENDYOL_JOB_MODE", "thread").strip().lower()
+JOB_PROCESS_START_METHOD = "spawn"
+
+
+class QueueFullError(Exception):
+    def __init__(self, queued: int, retry_after: int) -> None:
+        super().__init__(f"İş kuyruğu dolu ({queued} iş bekliyor).")
+        self.queued = queued
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """Runs jobs on a fixed set of worker threads, round-robin across owners."""
+
+    def __init__(
+        self,
+        runner: Callable[..., None],
+        workers: int = JOB_WORKERS,
+        max_queued: int = JOB_QUEUE_SIZE,
+        default_estimate: float = JOB_ESTIMATE_SECONDS,
+    ) -> None:
+        self._runner = runner
+        self.workers = max(1, workers)
+        self.max_queued = max(0, max_queued)
+        self._default_estimate = default_estimate
+        # owner -> waiting (job_id, args); the first owner is served next and then moved to the back.
+        self._owners: "OrderedDict[str, Deque[Tuple[str, Tuple[Any, ...]]]]" = OrderedDict()
+        self._queued = 0
+        self._running: Dict[str, float] = {}
+        self._durations: Deque[float] = deque(maxlen=JOB_DURATION_HISTORY)
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+
+    def submit(self, job_id: str, owner: str, *args: Any) -> int:
+        key = owner.strip().casefold()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("İş zamanlayıcısı kapatıldı.")
+            if self._queued >= self.max_queued and len(self._running) + self._queued >= self.workers:
+                # A slot opens roughly every average/workers seconds.
+                retry_after = max(1, math.ceil(self._average_duration() / self.workers))
+                raise QueueFullError(self._queued, retry_after)
+            self._owners.setdefault(key, deque()).append((job_id, args))
+            self._queued += 1
+            self._start_workers()
+            self._condition.notify()
+            return self._position_locked(job_id) or 0
+
+    def _start_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+        with self._condition:
+            while not self._owners and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return None
+            owner, waiting = next(iter(self._owners.items()))
+            job_id, args = waiting.popleft()
+            if waiting:
+                self._owners.move_to_end(owner)
+            else:
+                del self._owners[owner]
+            self._queued -= 1
+            self._running[job_id] = time.monotonic()
+            return job_id, args
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            job_id, args = job
+            try:
+                self._runner(job_id, *args)
+            except Exception:  # pylint: disable=broad-except
+                # The runner records its own failures; this only keeps the worker alive.
+                traceback.print_exc()
+            finally:
+                with self._condition:
+                    started = self._running.pop(job_id, None)
+                    if started is not None:
+                        self._durations.append(time.monotonic() - started)
+
+    def _position_locked(self, job_id: str) -> Optional[int]:
+        # Position in the round-robin order: the nth job of every owner runs before any (n+1)th job.
+        for owner_index, waiting in enumerate(self._owners.values()):
+            for index, (queued_id, _) in enumerate(waiting):
+                if queued_id != job_id:
+                    continue
+                ahead = 0
+                for other_index, other in enumerate(self._owners.values()):
+                    ahead += min(len(other), index)
+                    if other_index < owner_index and len(other) > index:
+                        ahead += 1
+                return ahead + 1
+        return None
+
+    def position(self, job_id: str) -> Optional[int]:
+        with self._condition:
+            return self._position_locked(job_id)
+
+    def _average_duration(self) -> float:
+        if not self._durations:
+            return self._default_estimate
+        return sum(self._durations) / len(self._durations)
+
+    def estimated_wait(self, position: int) -> float:
+        with self._condition:
+            average = self._average_duration()
+            now = time.monotonic()
+            # Each worker frees up once its current job reaches the average duration.
+            free_at = sorted(max(0.0, average - (now - started)) for started in self._running.values())
+        free_at += [0.0] * (self.workers - len(free_at))
+        rounds, slot = divmod(max(0, position - 1), self.workers)
+        return round(free_at[slot] + rounds * average, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "workers": self.workers,
+                "running": len(self._running),
+                "queued": self._queued,
+                "max_queued": self.max_queued,
+                "owners_waiting": len(self._owners),
+                "average_job_seconds": round(self._average_duration(), 1),
+            }
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._owners.clear()
+            self._queued = 0
+            self._condition.notify_all()
+
+
+_worker_updates: Optional[Any] = None
+
+
+def _init_worker_process(updates: Any, finalizer: Optional[Callable[[], None]]) -> None:
+    global _worker_updates
+    _worker_updates = updates
+    if finalizer is not None:
+        # Runs when the pool stops the worker; atexit hooks do not run in multiprocessing children.
+        multiprocessing.util.Finalize(None, finalizer, exitpriority=10)
+
+
+def publish_job_update(job_id: str, fields: Dict[str, Any]) -> bool:
+    if _worker_updates is None:
+        return False
+    _worker_updates.put((job_id, fields))
+    return True
+
+
+class ProcessJobRunner:
+    """Runs a job target in worker processes and relays their job updates to the parent."""
+
+    def __init__(
+        self,
+        target: Callable[..., None],
+        apply_update: Callable[[str, Dict[str, Any]], None],
+        workers: int = JOB_WORKERS,
+        finalizer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._target = target
+        self._apply_update = apply_update
+        self._workers = max(1, workers)
+        self._finalizer = finalizer
+        self._context = multiprocessing.get_context(JOB_PROCESS_START_METHOD)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._retired: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _get_executor(self) -> Tuple[ProcessPoolExecutor, threading.Event]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("İş süreç havuzu kapatıldı.")
+            if self._executor is None or self._retired is None:
+                # Every pool gets its own update queue: a killed worker can leave a shared queue's lock held.
+                updates = self._context.Queue()
+                self._retired = threading.Event()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=self._context,
+                    initializer=_init_worker_process,
+                    initargs=(updates, self._finalizer),
+                )
+                threading.Thread(
+                    target=self._listen, args=(updates, self._retired), name="job-updates", daemon=True
+                ).start()
+            return self._executor, self._retired
+
+    def run(self, job_id: str, *args: Any) -> Any:
+        executor, retired = self._get_executor()
+        try:
+            return executor.submit(self._target, job_id, *args).result()
+        except BrokenProcessPool:
+            # A worker died mid-job; later jobs get a fresh pool instead of the broken one.
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+                    self._retired = None
+            retired.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def _listen(self, updates: Any, retired: threading.Event) -> None:
+        while True:
+            try:
+                job_id, fields = updates.get(timeout=1.0)
+            except queue.Empty:
+                if retired.is_set():
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            try:
+                self._apply_update(job_id, fields)
+            except Exception:  # pylint: disable=broad-except
+                traceback.print_exc()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+            retired, self._retired = self._retired, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if retired is not None:
+            retired.set()
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+TRACE_ENABLED = os.getenv("TRENDYOL_TRACE", "0") == "1"
+
+
+class JobTrace:
+    """Collects spans of one search as Chrome trace events (chrome://tracing, Perfetto)."""
+
+    enabled = True
+
+    def __init__(self, name: str = "trendyol search") -> None:
+        self.name = name
+        self._origin = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, category: str, started: float, duration: float, **args: Any) -> None:
+        # started is a time.perf_counter() value; Chrome traces use microseconds.
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((started - self._origin) * 1_000_000, 1),
+            "dur": round(duration * 1_000_000, 1),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident or 0, thread.name)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        # The yielded dict becomes the span's args; callers add byte counts and outcomes to it.
+        started = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, category, started, time.perf_counter() - started, **args)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        metadata.extend(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in threads.items()
+        )
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file, ensure_ascii=False, default=str)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> Dict[str, Any]:
+        return {}
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+class NullTrace:
+    """Stand-in used when tracing is off: every call is a no-op."""
+
+    enabled = False
+    _span = _NullSpan()
+
+    def add(self, name: str, category: str, started: float, duration: float, **args: Any) -> None:
+        return None
+
+    def span(self, name: str, category: str, **args: Any) -> _NullSpan:
+        return self._span
+
+
+NULL_TRACE: Any = NullTrace()
+
+
+def new_job_trace(enabled: Optional[bool] = None, name: str = "trendyol search") -> Any:
+    return JobTrace(name) if (TRACE_ENABLED if enabled is None else enabled) else NULL_TRACE
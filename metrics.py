@@ -0,0 +1,272 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+ROUND_BUCKETS = (1, 2, 3, 5, 8, 12, 20, 30, 40)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def drain(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, float]) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def drain(self) -> Dict[LabelValues, List[Any]]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, List[Any]]) -> None:
+        with self._lock:
+            for key, (counts, total) in values.items():
+                entry = self._values.get(key)
+                if entry is None:
+                    entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+                entry[0] = [mine + theirs for mine, theirs in zip(entry[0], counts)]
+                entry[1] += total
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(counts), total) for key, (counts, total) in self._values.items())
+        lines: List[str] = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(Metric):
+    """Read at scrape time from a callback, so it never goes stale."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]) -> None:
+        super().__init__(name, documentation)
+        self._read = read
+
+    def _samples(self) -> List[str]:
+        try:
+            value = self._read()
+        except Exception:  # pylint: disable=broad-except
+            return []
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, read: Callable[[], float]) -> Gauge:
+        gauge = Gauge(name, documentation, read)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> Dict[str, Any]:
+        # Counts recorded since the last drain; job worker processes hand these to the web process.
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: metric.drain() for metric in metrics if isinstance(metric, (Counter, Histogram))
+        }
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, values in state.items():
+            metric = metrics.get(name)
+            if isinstance(metric, (Counter, Histogram)):
+                metric.merge(values)
+
+
+REGISTRY = MetricsRegistry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SEARCH_PAGE_SECONDS = REGISTRY.histogram(
+    "trendyol_search_page_load_seconds", "Time to load one search results page.", ["method"]
+)
+SCROLL_ROUNDS = REGISTRY.histogram(
+    "trendyol_scroll_rounds", "Scroll rounds load_all_results needed per search page.", buckets=ROUND_BUCKETS
+)
+SCROLL_SECONDS = REGISTRY.histogram(
+    "trendyol_scroll_seconds", "Time load_all_results spent scrolling one search page."
+)
+DETAIL_HTTP_SECONDS = REGISTRY.histogram(
+    "trendyol_detail_http_fetch_seconds", "Product detail page fetch time over HTTP."
+)
+BROWSER_FETCH_SECONDS = REGISTRY.histogram(
+    "trendyol_browser_fetch_seconds", "Page fetch time through the Selenium fallback.", ["kind"]
+)
+SELLER_FETCH_SECONDS = REGISTRY.histogram(
+    "trendyol_seller_fetch_seconds", "Seller store lookup time on a seller cache miss."
+)
+EXPORT_SECONDS = REGISTRY.histogram(
+    "trendyol_export_seconds", "Time spent writing a job's result file.", ["format"]
+)
+BROWSER_FALLBACKS = REGISTRY.counter(
+    "trendyol_browser_fallbacks_total", "Fetches that fell back from requests to Selenium.", ["kind"]
+)
+SELLER_CACHE_LOOKUPS = REGISTRY.counter(
+    "trendyol_seller_cache_lookups_total", "Seller cache lookups by result.", ["result"]
+)
+HTTP_RESPONSES = REGISTRY.counter(
+    "trendyol_http_responses_total", "HTTP responses received from Trendyol by status code.", ["kind", "status"]
+)
+JOBS_FINISHED = REGISTRY.counter("trendyol_jobs_finished_total", "Finished search jobs by status.", ["status"])
+HTTP_RECEIVED_BYTES = REGISTRY.counter(
+    "trendyol_http_received_bytes_total",
+    "Response body bytes by host, as transferred (wire) and after decompression (decoded).",
+    ["host", "form"],
+)
+HTTP_RETRY_ATTEMPTS = REGISTRY.counter(
+    "trendyol_http_retries_total", "HTTP requests retried by the shared transport.", ["reason"]
+)
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "trendyol_rate_limit_wait_seconds", "Time a request waited for the per-host rate limiter."
+)
+RATE_LIMIT_DECREASES = REGISTRY.counter(
+    "trendyol_rate_limit_decreases_total",
+    "Per-host rate limit cuts by the signal that caused them.",
+    ["host", "reason"],
+)
+PAGE_FETCHES = REGISTRY.counter(
+    "trendyol_page_fetches_total", "Pages obtained per kind, over plain HTTP or through Selenium.", ["kind", "method"]
+)
+SESSION_REFRESHES = REGISTRY.counter(
+    "trendyol_session_refreshes_total", "Browser visits to refresh a challenged session's cookies.", ["outcome"]
+)
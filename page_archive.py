@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+ARCHIVE_ENABLED = os.getenv("TRENDYOL_ARCHIVE", "0") == "1"
+ARCHIVE_COMPRESSION_LEVEL = 6
+ARCHIVE_COMMIT_EVERY = 50
+
+
+class PageArchive:
+    """Every page one search fetched, so parsing and enrichment can be re-run later without the network.
+
+    Opened for capture, fetched pages are recorded as they arrive; opened with replay=True, lookups
+    are answered from the file and nothing is written.
+    """
+
+    def __init__(self, path: str, replay: bool = False) -> None:
+        self.path = path
+        self.replaying = replay
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._counters = {"recorded": 0, "hits": 0, "misses": 0}
+        if replay:
+            self._db = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "kind TEXT NOT NULL, page_key TEXT NOT NULL, url TEXT NOT NULL, body BLOB NOT NULL, "
+                "fetched_at REAL NOT NULL, PRIMARY KEY (kind, page_key))"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+
+    def record(self, kind: str, key: str, url: str, body: str) -> None:
+        if self.replaying:
+            return
+        compressed = zlib.compress(body.encode("utf-8"), ARCHIVE_COMPRESSION_LEVEL)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (kind, page_key, url, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, url, compressed, time.time()),
+            )
+            self._counters["recorded"] += 1
+            self._pending += 1
+            if self._pending >= ARCHIVE_COMMIT_EVERY:
+                self._db.commit()
+                self._pending = 0
+
+    def lookup(self, kind: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body FROM pages WHERE kind = ? AND page_key = ?", (kind, key)
+            ).fetchone()
+            self._counters["misses" if row is None else "hits"] += 1
+        if row is None:
+            return None
+        try:
+            return zlib.decompress(row[0]).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError):
+            return None
+
+    def set_meta(self, **values: Any) -> None:
+        if self.replaying:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                [(name, str(value)) for name, value in values.items()],
+            )
+            self._db.commit()
+
+    def meta(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._db.execute("SELECT name, value FROM meta").fetchall())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._counters)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self.replaying:
+                self._db.commit()
+            self._db.close()
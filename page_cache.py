@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, NamedTuple, Optional
+
+from seller_cache import CACHE_DIR
+
+PAGE_CACHE_ENABLED = os.getenv("TRENDYOL_PAGE_CACHE", "0") == "1"
+PAGE_CACHE_PATH = os.getenv("TRENDYOL_PAGE_CACHE_PATH", os.path.join(CACHE_DIR, "pages.sqlite3"))
+PAGE_CACHE_TTL_SECONDS = float(os.getenv("TRENDYOL_PAGE_CACHE_TTL", "900"))
+PAGE_CACHE_MAX_BYTES = int(float(os.getenv("TRENDYOL_PAGE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+PAGE_CACHE_COMPRESSION_LEVEL = 6
+
+
+class CachedPage(NamedTuple):
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class PageCache:
+    def __init__(
+        self,
+        path: str = PAGE_CACHE_PATH,
+        ttl_seconds: float = PAGE_CACHE_TTL_SECONDS,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max(1, max_bytes)
+        self._lock = threading.Lock()
+        self._counters = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "cache_key TEXT PRIMARY KEY, url TEXT NOT NULL, body BLOB NOT NULL, etag TEXT, "
+            "last_modified TEXT, stored_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        self._db.commit()
+        self._total_bytes = int(self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0])
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.stored_at < self.ttl_seconds
+
+    def lookup(self, key: str) -> Optional[CachedPage]:
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT body, etag, last_modified, stored_at FROM pages WHERE cache_key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            try:
+                self._db.execute("UPDATE pages SET last_access = ? WHERE cache_key = ?", (time.time(), key))
+                self._db.commit()
+            except sqlite3.Error:
+                self._rollback()
+        try:
+            body = zlib.decompress(row[0]).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError):
+            self.discard(key)
+            return None
+        page = CachedPage(body=body, etag=row[1], last_modified=row[2], stored_at=row[3])
+        with self._lock:
+            self._counters["fresh_hits" if self.is_fresh(page) else "misses"] += 1
+        return page
+
+    def store(
+        self,
+        key: str,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        compressed = zlib.compress(body.encode("utf-8"), PAGE_CACHE_COMPRESSION_LEVEL)
+        now = time.time()
+        with self._lock:
+            # A locked or full database only costs this page its cache entry.
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages "
+                    "(cache_key, url, body, etag, last_modified, stored_at, last_access, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, compressed, etag, last_modified, now, now, len(compressed)),
+                )
+                self._evict()
+                self._db.commit()
+            except sqlite3.Error:
+                self._rollback()
+                return
+            self._counters["stores"] += 1
+
+    def revalidated(self, key: str) -> None:
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute(
+                    "UPDATE pages SET stored_at = ?, last_access = ? WHERE cache_key = ?", (now, now, key)
+                )
+                self._db.commit()
+            except sqlite3.Error:
+                self._rollback()
+            self._counters["revalidated"] += 1
+            # lookup() counted the stale entry as a miss; a 304 turns it into a hit.
+            self._counters["misses"] -= 1
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT size FROM pages WHERE cache_key = ?", (key,)).fetchone()
+                if row is None:
+                    return
+                self._db.execute("DELETE FROM pages WHERE cache_key = ?", (key,))
+                self._db.commit()
+            except sqlite3.Error:
+                self._rollback()
+                return
+            self._total_bytes -= row[0]
+
+    def _evict(self) -> None:
+        # Other worker processes write to the same file, so the size is read back rather than tracked locally.
+        self._total_bytes = int(self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0])
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        for key, size in self._db.execute(
+            "SELECT cache_key, size FROM pages ORDER BY last_access ASC"
+        ).fetchall():
+            if self._total_bytes <= target:
+                break
+            self._db.execute("DELETE FROM pages WHERE cache_key = ?", (key,))
+            self._total_bytes -= size
+            self._counters["evictions"] += 1
+
+    def _rollback(self) -> None:
+        try:
+            self._db.rollback()
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters: Dict[str, Any] = dict(self._counters)
+            counters["bytes"] = self._total_bytes
+        return counters
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    global _page_cache
+    if not PAGE_CACHE_ENABLED:
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            try:
+                _page_cache = PageCache()
+            except (OSError, sqlite3.Error):
+                return None
+        return _page_cache
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from metrics import RATE_LIMIT_DECREASES, RATE_LIMIT_WAIT_SECONDS
+
+RATE_LIMIT_ENABLED = os.getenv("TRENDYOL_RATE_LIMIT", "1") != "0"
+RATE_LIMIT_INITIAL = float(os.getenv("TRENDYOL_RATE_LIMIT_INITIAL", "8"))
+RATE_LIMIT_MIN = float(os.getenv("TRENDYOL_RATE_LIMIT_MIN", "0.5"))
+RATE_LIMIT_MAX = float(os.getenv("TRENDYOL_RATE_LIMIT_MAX", "50"))
+RATE_LIMIT_BURST = float(os.getenv("TRENDYOL_RATE_LIMIT_BURST", "5"))
+# Additive step: requests/second gained per second's worth of clean responses.
+RATE_LIMIT_INCREASE = 1.0
+RATE_LIMIT_BLOCK_FACTOR = 0.5
+RATE_LIMIT_SLOWDOWN_FACTOR = 0.8
+# Fast latency average this many times over the slow baseline counts as the site slowing down.
+RATE_LIMIT_LATENCY_FACTOR = 2.0
+# One decrease per window, so a burst of refusals from requests already in flight halves the rate once.
+RATE_LIMIT_DECREASE_COOLDOWN = 2.0
+RATE_LIMIT_MAX_PAUSE = 60.0
+LATENCY_FAST_WEIGHT = 0.3
+LATENCY_BASELINE_WEIGHT = 0.02
+BLOCKED_STATUSES = (403, 429)
+
+
+class HostBucket:
+    __slots__ = (
+        "rate",
+        "tokens",
+        "updated",
+        "paused_until",
+        "last_decrease",
+        "latency_fast",
+        "latency_baseline",
+    )
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.tokens = burst
+        self.updated = now
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.latency_fast: Optional[float] = None
+        self.latency_baseline: Optional[float] = None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return min(RATE_LIMIT_MAX_PAUSE, max(0.0, float(value))) if value else None
+    except ValueError:
+        return None
+
+
+class AdaptiveRateLimiter:
+    """Token bucket per host whose rate adapts AIMD-style: it climbs while responses are clean and
+    is cut on refusals (429/403, pages missing their data), 5xx/connection errors and rising latency.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = RATE_LIMIT_INITIAL,
+        min_rate: float = RATE_LIMIT_MIN,
+        max_rate: float = RATE_LIMIT_MAX,
+        burst: float = RATE_LIMIT_BURST,
+    ) -> None:
+        self.min_rate = max(0.01, min_rate)
+        self.max_rate = max(self.min_rate, max_rate)
+        self.initial_rate = min(self.max_rate, max(self.min_rate, initial_rate))
+        self.burst = max(1.0, burst)
+        self._buckets: Dict[str, HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str, now: float) -> HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = HostBucket(self.initial_rate, self.burst, now)
+        return bucket
+
+    def acquire(self, url: str) -> float:
+        # Reserves a token and sleeps until it is due; the balance may go negative so that
+        # concurrent callers queue up behind each other instead of all waking at once.
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            bucket.tokens -= 1
+            wait = max(-bucket.tokens / bucket.rate, bucket.paused_until - now, 0.0)
+        if wait > 0:
+            RATE_LIMIT_WAIT_SECONDS.observe(wait)
+            time.sleep(wait)
+        return wait
+
+    def observe(
+        self,
+        url: str,
+        status: Optional[int],
+        latency: Optional[float] = None,
+        blocked: bool = False,
+        retry_after: Optional[str] = None,
+    ) -> None:
+        # status None means the request failed before a response arrived.
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            if blocked or status in BLOCKED_STATUSES:
+                self._decrease(bucket, host, now, RATE_LIMIT_BLOCK_FACTOR, "blocked")
+                pause = parse_retry_after(retry_after) if status == 429 else None
+                if pause:
+                    bucket.paused_until = max(bucket.paused_until, now + pause)
+                return
+            if status is None or status >= 500:
+                self._decrease(bucket, host, now, RATE_LIMIT_SLOWDOWN_FACTOR, "error")
+                return
+            if latency is not None and self._latency_rising(bucket, latency):
+                self._decrease(bucket, host, now, RATE_LIMIT_SLOWDOWN_FACTOR, "latency")
+                return
+            bucket.rate = min(self.max_rate, bucket.rate + RATE_LIMIT_INCREASE / bucket.rate)
+
+    @staticmethod
+    def _latency_rising(bucket: HostBucket, latency: float) -> bool:
+        if bucket.latency_fast is None or bucket.latency_baseline is None:
+            bucket.latency_fast = bucket.latency_baseline = latency
+            return False
+        bucket.latency_fast += LATENCY_FAST_WEIGHT * (latency - bucket.latency_fast)
+        bucket.latency_baseline += LATENCY_BASELINE_WEIGHT * (latency - bucket.latency_baseline)
+        return bucket.latency_fast > bucket.latency_baseline * RATE_LIMIT_LATENCY_FACTOR
+
+    def _decrease(self, bucket: HostBucket, host: str, now: float, factor: float, reason: str) -> None:
+        if now - bucket.last_decrease < RATE_LIMIT_DECREASE_COOLDOWN:
+            return
+        bucket.rate = max(self.min_rate, bucket.rate * factor)
+        bucket.tokens = min(bucket.tokens, 0.0)
+        bucket.last_decrease = now
+        RATE_LIMIT_DECREASES.inc(host=host, reason=reason)
+
+    def rate(self, url_or_host: str) -> Optional[float]:
+        host = urlsplit(url_or_host).hostname or url_or_host
+        with self._lock:
+            bucket = self._buckets.get(host)
+            return bucket.rate if bucket is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    "rate": round(bucket.rate, 2),
+                    "paused_seconds": round(max(0.0, bucket.paused_until - now), 2),
+                    "latency_seconds": None if bucket.latency_fast is None else round(bucket.latency_fast, 3),
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+
+class NullRateLimiter:
+    """Stand-in used when rate limiting is off."""
+
+    def acquire(self, url: str) -> float:
+        return 0.0
+
+    def observe(self, url: str, status: Optional[int], latency: Optional[float] = None, **kwargs: Any) -> None:
+        return None
+
+    def rate(self, url_or_host: str) -> Optional[float]:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+_rate_limiter: Any = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Any:
+    # One limiter per process, so concurrent jobs share each host's budget.
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = AdaptiveRateLimiter() if RATE_LIMIT_ENABLED else NullRateLimiter()
+        return _rate_limiter
@@ -0,0 +1,46 @@
+import argparse
+import os
+import time
+
+from page_archive import PageArchive
+from result_writers import DEFAULT_RESULT_FORMAT, available_result_formats, open_result_writer, result_extension
+from trendyol_search import search_trendyol
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Kaydedilmiş bir iş arşivindeki sayfaları ağa çıkmadan yeniden ayrıştırır."
+    )
+    parser.add_argument("archive", help="outputs/trendyol_archive_<job_id>.sqlite3 dosyası")
+    parser.add_argument("-o", "--output", help="Sonuç dosyası (varsayılan: arşiv adı + biçim uzantısı)")
+    parser.add_argument("--format", default=DEFAULT_RESULT_FORMAT, choices=available_result_formats())
+    parser.add_argument("--detail-concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    archive = PageArchive(args.archive, replay=True)
+    try:
+        meta = archive.meta()
+        if "query" not in meta:
+            parser.error("Arşivde arama bilgisi yok.")
+        output_path = args.output or os.path.splitext(args.archive)[0] + result_extension(args.format)
+        writer = open_result_writer(args.format, output_path)
+        started = time.perf_counter()
+        with writer:
+            search_trendyol(
+                meta["query"],
+                max_pages=int(meta.get("max_pages", 0)) or None,
+                detail_concurrency=args.detail_concurrency,
+                row_sink=writer.write,
+                archive=archive,
+            )
+        elapsed = time.perf_counter() - started
+        stats = archive.stats()
+    finally:
+        archive.close()
+    print(f"Arama: {meta['query']}")
+    print(f"{writer.rows_written} satır {elapsed:.2f} sn içinde yeniden üretildi")
+    print(f"Arşivden okunan sayfa: {stats['hits']}, arşivde bulunmayan: {stats['misses']}")
+
+
+if __name__ == "__main__":
+    main()
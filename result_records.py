@@ -0,0 +1,220 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+OUTPUT_COLUMNS = [
+    "Product ID",
+    "Product Name",
+    "Product Code",
+    "Category Name",
+    "Category Hierarchy",
+    "Category ID",
+    "Brand",
+    "Product URL",
+    "Image URLs",
+    "Merchant Type",
+    "Merchant ID",
+    "Merchant Name",
+    "officialName",
+    "cityName",
+    "registeredEmailAddress",
+    "taxNumber",
+    "sellerLink",
+    "Price Text",
+    "Price Value",
+    "Currency",
+    "Listing ID",
+    "Stock",
+    "Fulfilment Type",
+    "isTyPlusEligible",
+]
+MISSING = "N/A"
+
+# Column -> (True if stored on the shared ProductInfo, attribute name).
+COLUMN_ATTRIBUTES: Dict[str, Tuple[bool, str]] = {
+    "Product ID": (True, "product_id"),
+    "Product Name": (True, "product_name"),
+    "Product Code": (True, "product_code"),
+    "Category Name": (True, "category_name"),
+    "Category Hierarchy": (True, "category_hierarchy"),
+    "Category ID": (True, "category_id"),
+    "Brand": (True, "brand"),
+    "Product URL": (True, "product_url"),
+    "Image URLs": (True, "image_urls"),
+    "Merchant Type": (False, "merchant_type"),
+    "Merchant ID": (False, "merchant_id"),
+    "Merchant Name": (False, "merchant_name"),
+    "officialName": (False, "official_name"),
+    "cityName": (False, "city_name"),
+    "registeredEmailAddress": (False, "email"),
+    "taxNumber": (False, "tax_number"),
+    "sellerLink": (False, "seller_link"),
+    "Price Text": (False, "price_text"),
+    "Price Value": (False, "price_value"),
+    "Currency": (False, "currency"),
+    "Listing ID": (False, "listing_id"),
+    "Stock": (False, "stock"),
+    "Fulfilment Type": (False, "fulfilment"),
+    "isTyPlusEligible": (False, "ty_plus"),
+}
+CATEGORICAL_ATTRIBUTES = ("merchant_type", "fulfilment", "currency")
+
+
+def _stored(value: Any) -> Any:
+    return None if value is None or value == MISSING else value
+
+
+def to_float(value: Any) -> Optional[float]:
+    value = _stored(value)
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_integer(value: Any) -> Optional[int]:
+    value = _stored(value)
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _category(value: Any) -> Optional[str]:
+    value = _stored(value)
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ProductInfo:
+    __slots__ = (
+        "product_id",
+        "product_name",
+        "product_code",
+        "category_name",
+        "category_hierarchy",
+        "category_id",
+        "brand",
+        "product_url",
+        "image_urls",
+    )
+
+    def __init__(self, product: Dict[str, Any], general: Dict[str, Any]) -> None:
+        images = general.get("images") or [product.get("image_url") or MISSING]
+        self.product_id = product["product_id"]
+        self.product_name = product["product_name"]
+        self.product_code = _stored(general.get("product_code"))
+        self.category_name = _stored(general.get("category_name"))
+        self.category_hierarchy = _stored(general.get("category_hierarchy"))
+        self.category_id = _stored(product.get("category_id"))
+        self.brand = _stored(general.get("brand"))
+        self.product_url = product["product_url"]
+        self.image_urls = _stored(" | ".join([img for img in images if img]) or None)
+
+    @classmethod
+    def from_row(cls, row: Mapping) -> "ProductInfo":
+        info = cls.__new__(cls)
+        for column, (on_product, attribute) in COLUMN_ATTRIBUTES.items():
+            if on_product:
+                setattr(info, attribute, _stored(row.get(column)))
+        return info
+
+
+class ResultRecord(Mapping):
+    __slots__ = (
+        "product",
+        "merchant_type",
+        "merchant_id",
+        "merchant_name",
+        "official_name",
+        "city_name",
+        "email",
+        "tax_number",
+        "seller_link",
+        "price_text",
+        "price_value",
+        "currency",
+        "listing_id",
+        "stock",
+        "fulfilment",
+        "ty_plus",
+    )
+
+    def __init__(self, product: ProductInfo, merchant: Optional[Mapping] = None) -> None:
+        merchant = merchant or {}
+        self.product = product
+        for column, (on_product, attribute) in COLUMN_ATTRIBUTES.items():
+            if not on_product:
+                self._assign(attribute, merchant.get(column))
+
+    def _assign(self, attribute: str, value: Any) -> None:
+        if attribute == "price_value":
+            value = to_float(value)
+        elif attribute == "stock":
+            value = to_integer(value)
+        elif attribute in CATEGORICAL_ATTRIBUTES:
+            value = _category(value)
+        else:
+            value = _stored(value)
+        setattr(self, attribute, value)
+
+    def __getitem__(self, column: str) -> Any:
+        on_product, attribute = COLUMN_ATTRIBUTES[column]
+        value = getattr(self.product if on_product else self, attribute)
+        return MISSING if value is None else value
+
+    def __setitem__(self, column: str, value: Any) -> None:
+        on_product, attribute = COLUMN_ATTRIBUTES[column]
+        if on_product:
+            setattr(self.product, attribute, _stored(value))
+        else:
+            self._assign(attribute, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(OUTPUT_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(OUTPUT_COLUMNS)
+
+    @property
+    def is_placeholder(self) -> bool:
+        # The single merchant-less row written when a product's detail page could not be parsed.
+        return self.merchant_type is None and self.merchant_id is None
+
+    def values_list(self) -> List[Any]:
+        return [self[column] for column in OUTPUT_COLUMNS]
+
+    def raw_values(self) -> List[Any]:
+        # Stored values in column order, with None where values_list() shows MISSING.
+        return [
+            getattr(self.product if on_product else self, attribute)
+            for on_product, attribute in (COLUMN_ATTRIBUTES[column] for column in OUTPUT_COLUMNS)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {column: self[column] for column in OUTPUT_COLUMNS}
+
+    def __repr__(self) -> str:
+        return f"ResultRecord({self.to_dict()!r})"
+
+
+def records_from_detail(
+    product: Dict[str, Any], general: Dict[str, Any], merchants: List[Dict[str, Any]]
+) -> List[ResultRecord]:
+    info = ProductInfo(product, general)
+    if not merchants:
+        return [ResultRecord(info)]
+    return [ResultRecord(info, merchant) for merchant in merchants]
+
+
+def records_from_rows(rows: List[Mapping]) -> List[ResultRecord]:
+    # Rebuilds the records of one product from stored output rows.
+    if not rows:
+        return []
+    info = ProductInfo.from_row(rows[0])
+    return [ResultRecord(info, row) for row in rows]
@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+from typing import Any, Iterable, List, Mapping
+
+from openpyxl import Workbook
+
+from result_records import (
+    CATEGORICAL_ATTRIBUTES,
+    COLUMN_ATTRIBUTES,
+    OUTPUT_COLUMNS,
+    ResultRecord,
+    records_from_rows,
+    to_float,
+    to_integer,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is only offered when pyarrow is installed
+    pa = None
+    pq = None
+
+CSV_FLUSH_EVERY = 50
+PARQUET_BATCH_ROWS = 1000
+PARQUET_FLOAT_COLUMNS = frozenset({"Price Value"})
+# Listing IDs are opaque tokens, so they stay text.
+PARQUET_INTEGER_COLUMNS = frozenset({"Product ID", "Category ID", "Merchant ID", "Stock"})
+PARQUET_CATEGORICAL_COLUMNS = frozenset(
+    column for column, (_, attribute) in COLUMN_ATTRIBUTES.items() if attribute in CATEGORICAL_ATTRIBUTES
+)
+
+
+class ResultWriter:
+    extension = ""
+    mimetype = "application/octet-stream"
+
+    def __init__(self, output_path: str) -> None:
+        self.output_path = output_path
+        self.rows_written = 0
+        self._closed = False
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        if isinstance(row, ResultRecord):
+            self._write(row.values_list())
+        else:
+            self._write([row.get(column) for column in OUTPUT_COLUMNS])
+        self.rows_written += 1
+
+    def write_many(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _write(self, values: List[Any]) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+
+class XlsxResultWriter(ResultWriter):
+    extension = ".xlsx"
+    mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def __init__(self, output_path: str) -> None:
+        super().__init__(output_path)
+        # write_only streams rows to a temporary file; memory stays flat regardless of row count.
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Sheet1")
+        self._sheet.append(OUTPUT_COLUMNS)
+
+    def _write(self, values: List[Any]) -> None:
+        self._sheet.append(values)
+
+    def _close(self) -> None:
+        self._workbook.save(self.output_path)
+
+
+class CsvResultWriter(ResultWriter):
+    extension = ".csv"
+    mimetype = "text/csv"
+
+    def __init__(self, output_path: str) -> None:
+        super().__init__(output_path)
+        # utf-8-sig so Excel shows Turkish characters correctly.
+        self._file = open(output_path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(OUTPUT_COLUMNS)
+
+    def _write(self, values: List[Any]) -> None:
+        self._writer.writerow(values)
+        if (self.rows_written + 1) % CSV_FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class JsonLinesResultWriter(ResultWriter):
+    extension = ".jsonl"
+    mimetype = "application/x-ndjson"
+
+    def __init__(self, output_path: str) -> None:
+        super().__init__(output_path)
+        self._file = open(output_path, "w", encoding="utf-8")
+
+    def _write(self, values: List[Any]) -> None:
+        self._file.write(json.dumps(dict(zip(OUTPUT_COLUMNS, values)), ensure_ascii=False, default=str))
+        self._file.write("\n")
+        if (self.rows_written + 1) % CSV_FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class ParquetResultWriter(ResultWriter):
+    extension = ".parquet"
+    mimetype = "application/vnd.apache.parquet"
+
+    def __init__(self, output_path: str) -> None:
+        if pa is None:
+            raise RuntimeError("Parquet çıktısı için pyarrow kurulu olmalıdır.")
+        super().__init__(output_path)
+        self._schema = pa.schema([(column, parquet_column_type(column)) for column in OUTPUT_COLUMNS])
+        self._writer = pq.ParquetWriter(output_path, self._schema)
+        self._batch: List[List[Any]] = []
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        # Typed columns take the stored values, so missing fields become nulls rather than "N/A".
+        record = row if isinstance(row, ResultRecord) else records_from_rows([row])[0]
+        self._write(record.raw_values())
+        self.rows_written += 1
+
+    def _write(self, values: List[Any]) -> None:
+        self._batch.append(values)
+        if len(self._batch) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+        arrays = [
+            parquet_column_array(column, values) for column, values in zip(OUTPUT_COLUMNS, zip(*self._batch))
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+        self._batch = []
+
+    def _close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+def parquet_column_type(column: str) -> Any:
+    if column in PARQUET_FLOAT_COLUMNS:
+        return pa.float64()
+    if column in PARQUET_INTEGER_COLUMNS:
+        return pa.int64()
+    if column in PARQUET_CATEGORICAL_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def parquet_column_array(column: str, values: Iterable[Any]) -> Any:
+    if column in PARQUET_FLOAT_COLUMNS:
+        return pa.array([to_float(value) for value in values], pa.float64())
+    if column in PARQUET_INTEGER_COLUMNS:
+        return pa.array([to_integer(value) for value in values], pa.int64())
+    strings = pa.array([None if value is None else str(value) for value in values], pa.string())
+    if column in PARQUET_CATEGORICAL_COLUMNS:
+        return strings.dictionary_encode().cast(pa.dictionary(pa.int32(), pa.string()))
+    return strings
+
+
+RESULT_WRITERS = {
+    "xlsx": XlsxResultWriter,
+    "csv": CsvResultWriter,
+    "jsonl": JsonLinesResultWriter,
+    "parquet": ParquetResultWriter,
+}
+DEFAULT_RESULT_FORMAT = "xlsx"
+
+
+def available_result_formats() -> List[str]:
+    return [name for name in RESULT_WRITERS if name != "parquet" or pa is not None]
+
+
+def result_extension(output_format: str) -> str:
+    return RESULT_WRITERS[output_format].extension
+
+
+def result_mimetype(path: str) -> str:
+    for writer_class in RESULT_WRITERS.values():
+        if path.endswith(writer_class.extension):
+            return writer_class.mimetype
+    return ResultWriter.mimetype
+
+
+def open_result_writer(output_format: str, output_path: str) -> ResultWriter:
+    writer_class = RESULT_WRITERS.get(output_format)
+    if writer_class is None:
+        raise ValueError(f"Desteklenmeyen çıktı biçimi: {output_format}")
+    return writer_class(output_path)
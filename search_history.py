@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from seller_cache import CACHE_DIR
+
+SEARCH_HISTORY_PATH = os.getenv("TRENDYOL_SEARCH_HISTORY_PATH", os.path.join(CACHE_DIR, "searches.sqlite3"))
+# Carried-forward rows are refetched once they are this old, even if the listing looks unchanged.
+SEARCH_HISTORY_MAX_AGE_SECONDS = float(os.getenv("TRENDYOL_INCREMENTAL_MAX_AGE", str(24 * 3600)))
+
+
+class StoredListing(NamedTuple):
+    signal: str
+    rows: List[Dict[str, Any]]
+    fetched_at: float
+
+
+def history_key(query: str) -> str:
+    return " ".join(query.casefold().split())
+
+
+class SearchHistory:
+    def __init__(
+        self, path: str = SEARCH_HISTORY_PATH, max_age_seconds: float = SEARCH_HISTORY_MAX_AGE_SECONDS
+    ) -> None:
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            "query_key TEXT NOT NULL, product_id TEXT NOT NULL, signal TEXT NOT NULL, rows TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, PRIMARY KEY (query_key, product_id))"
+        )
+        self._db.commit()
+
+    def load(self, query: str) -> Dict[str, StoredListing]:
+        oldest = time.time() - self.max_age_seconds
+        with self._lock:
+            result = self._db.execute(
+                "SELECT product_id, signal, rows, fetched_at FROM listings WHERE query_key = ? AND fetched_at >= ?",
+                (history_key(query), oldest),
+            ).fetchall()
+        return {
+            product_id: StoredListing(signal=signal, rows=json.loads(rows), fetched_at=fetched_at)
+            for product_id, signal, rows, fetched_at in result
+        }
+
+    def store(self, query: str, listings: Iterable[Tuple[str, StoredListing]]) -> None:
+        # Called as products finish, so a run never holds all of its rows; a failed write only costs
+        # those products their carry-forward on the next run.
+        key = history_key(query)
+        entries = [
+            (key, product_id, listing.signal, json.dumps(listing.rows, ensure_ascii=False), listing.fetched_at)
+            for product_id, listing in listings
+        ]
+        with self._lock:
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO listings (query_key, product_id, signal, rows, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        entries,
+                    )
+            except sqlite3.Error:
+                pass
+
+    def prune(self, query: str, product_ids: Set[str]) -> None:
+        # Drops products that left the results, so the stored run becomes exactly this run.
+        key = history_key(query)
+        with self._lock:
+            try:
+                with self._db:
+                    stale = [
+                        (key, product_id)
+                        for (product_id,) in self._db.execute(
+                            "SELECT product_id FROM listings WHERE query_key = ?", (key,)
+                        ).fetchall()
+                        if product_id not in product_ids
+                    ]
+                    self._db.executemany("DELETE FROM listings WHERE query_key = ? AND product_id = ?", stale)
+            except sqlite3.Error:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_search_history: Optional[SearchHistory] = None
+_search_history_lock = threading.Lock()
+
+
+def get_search_history() -> Optional[SearchHistory]:
+    global _search_history
+    with _search_history_lock:
+        if _search_history is None:
+            try:
+                _search_history = SearchHistory()
+            except (OSError, sqlite3.Error):
+                return None
+        return _search_history
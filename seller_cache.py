@@ -0,0 +1,131 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+CACHE_DIR = os.getenv(
+    "TRENDYOL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+)
+SELLER_CACHE_PATH = os.getenv("TRENDYOL_SELLER_CACHE_PATH", os.path.join(CACHE_DIR, "sellers.sqlite3"))
+SELLER_CACHE_TTL_SECONDS = float(os.getenv("TRENDYOL_SELLER_CACHE_TTL", str(7 * 24 * 3600)))
+SELLER_NEGATIVE_TTL_SECONDS = float(os.getenv("TRENDYOL_SELLER_NEGATIVE_TTL", "3600"))
+SELLER_CACHE_MEMORY_SIZE = int(os.getenv("TRENDYOL_SELLER_CACHE_SIZE", "5000"))
+
+
+class SellerCache:
+    def __init__(
+        self,
+        path: Optional[str] = SELLER_CACHE_PATH,
+        ttl_seconds: float = SELLER_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: float = SELLER_NEGATIVE_TTL_SECONDS,
+        memory_size: int = SELLER_CACHE_MEMORY_SIZE,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._memory_size = max(1, memory_size)
+        self._memory: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "negative_hits": 0, "misses": 0, "expired": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS sellers ("
+                    "merchant_id TEXT PRIMARY KEY, details TEXT NOT NULL, stored_at REAL NOT NULL)"
+                )
+                self._db.commit()
+            except (OSError, sqlite3.Error):
+                # A broken or read-only cache file or directory must not stop scraping; keep the memory tier only.
+                self._db = None
+
+    def _is_fresh(self, details: Dict[str, Any], stored_at: float, now: float) -> bool:
+        ttl = self.ttl_seconds if details else self.negative_ttl_seconds
+        return now - stored_at < ttl
+
+    def _remember(self, key: str, details: Dict[str, Any], stored_at: float) -> None:
+        self._memory[key] = (details, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, merchant_id: Any) -> Optional[Dict[str, Any]]:
+        key = str(merchant_id)
+        now = time.time()
+        expired = False
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                details, stored_at = entry
+                if self._is_fresh(details, stored_at, now):
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits" if details else "negative_hits"] += 1
+                    return dict(details)
+                del self._memory[key]
+                expired = True
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT details, stored_at FROM sellers WHERE merchant_id = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    details = json.loads(row[0])
+                    if self._is_fresh(details, row[1], now):
+                        self._remember(key, details, row[1])
+                        self._counters["disk_hits" if details else "negative_hits"] += 1
+                        return dict(details)
+                    expired = True
+            if expired:
+                self._counters["expired"] += 1
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, merchant_id: Any, details: Dict[str, Any]) -> None:
+        key = str(merchant_id)
+        stored_at = time.time()
+        details = dict(details or {})
+        with self._lock:
+            self._remember(key, details, stored_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO sellers (merchant_id, details, stored_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(details, ensure_ascii=False), stored_at),
+                    )
+                    self._db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["memory_entries"] = len(self._memory)
+        hits = counters["memory_hits"] + counters["disk_hits"] + counters["negative_hits"]
+        lookups = hits + counters["misses"]
+        counters["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return counters
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_seller_cache: Optional[SellerCache] = None
+_seller_cache_lock = threading.Lock()
+
+
+def get_seller_cache() -> SellerCache:
+    global _seller_cache
+    with _seller_cache_lock:
+        if _seller_cache is None:
+            _seller_cache = SellerCache()
+        return _seller_cache
@@ -1,29 +1,75 @@
+import hashlib
 import json
 import os
+import queue
 import re
+import threading
 import time
 import unicodedata
-from typing import Any, Callable, Dict, List, Optional, Set
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple, Union
 from urllib.parse import quote_plus
 
-import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
-BASE_URL = "https://www.trendyol.com"
-SEARCH_URL_TEMPLATE = "https://www.trendyol.com/sr?q={query}&qt={query}&st={query}&os=1"
-SELLER_LINK_TEMPLATE = "https://www.trendyol.com/magaza/{slug}-m-{merchant_id}"
+from http_transport import new_session
+from job_trace import NULL_TRACE
+from metrics import (
+    BROWSER_FALLBACKS,
+    BROWSER_FETCH_SECONDS,
+    DETAIL_HTTP_SECONDS,
+    EXPORT_SECONDS,
+    HTTP_RESPONSES,
+    PAGE_FETCHES,
+    SCROLL_ROUNDS,
+    SCROLL_SECONDS,
+    SEARCH_PAGE_SECONDS,
+    SELLER_CACHE_LOOKUPS,
+    SELLER_FETCH_SECONDS,
+    SESSION_REFRESHES,
+)
+from page_archive import PageArchive
+from page_cache import PageCache, get_page_cache
+from rate_limiter import get_rate_limiter
+from result_records import ResultRecord, records_from_detail, records_from_rows
+from result_writers import XlsxResultWriter
+from search_history import StoredListing, get_search_history
+from seller_cache import SellerCache, get_seller_cache
+
+try:
+    import orjson
+except ImportError:  # optional, speeds up decoding of the embedded props blobs
+    orjson = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # card parsing falls back to BeautifulSoup with html.parser
+    lxml_html = None
+
+# Overridable so benchmark_e2e.py can point the scraper at its local stand-in server.
+BASE_URL = os.getenv("TRENDYOL_BASE_URL", "https://www.trendyol.com").rstrip("/")
+SEARCH_URL_TEMPLATE = BASE_URL + "/sr?q={query}&qt={query}&st={query}&os=1"
+SELLER_LINK_TEMPLATE = BASE_URL + "/magaza/{slug}-m-{merchant_id}"
+IMAGE_CDN_URL = "https://cdn.dsmcdn.com"
 DETAIL_SCRIPT_PATTERN = r'window\["__envoy_flash-sales-banner__PROPS"\]=({.*?})</script>'
 SELLER_PROPS_PATTERNS = [
     r'window\["__envoy_seller-storefront-web__PROPS"\]=({.*?})</script>',
     r'window\["__envoy_seller-storefront__PROPS"\]=({.*?})</script>',
 ]
+ENVOY_PROPS_PREFIX = 'window["__envoy_'
+DETAIL_PROPS_NAME = "__envoy_flash-sales-banner__PROPS"
+SELLER_PROPS_NAMES = ["__envoy_seller-storefront-web__PROPS", "__envoy_seller-storefront__PROPS"]
+SEARCH_STATE_MARKER = "window.__SEARCH_APP_INITIAL_STATE__"
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
@@ -34,10 +80,124 @@ DEFAULT_MAX_PAGES = int(os.getenv("TRENDYOL_MAX_PAGES", "7"))
 SCROLL_PAUSE_SECONDS = 1.25
 MAX_SCROLL_ROUNDS = 40
 STAGNATION_LIMIT = 3
+READY_IDLE_MS = int(os.getenv("TRENDYOL_READY_IDLE_MS", "500"))
+READY_TIMEOUT_SECONDS = float(os.getenv("TRENDYOL_READY_TIMEOUT_SECONDS", "5"))
+SEARCH_PAGE_SIZE = 24
+HTTP_SEARCH_ENABLED = os.getenv("TRENDYOL_HTTP_SEARCH", "1") != "0"
+DETAIL_CONCURRENCY = int(os.getenv("TRENDYOL_DETAIL_CONCURRENCY", "6"))
+SELLER_CONCURRENCY = int(os.getenv("TRENDYOL_SELLER_CONCURRENCY", "4"))
+SEARCH_PAGE_CONCURRENCY = int(os.getenv("TRENDYOL_SEARCH_PAGE_CONCURRENCY", "3"))
+# Finished products written to the search history at a time in incremental mode.
+HISTORY_WRITE_BATCH = 50
+PIPELINE_QUEUE_SIZE = SEARCH_PAGE_SIZE * 2
+DRIVER_POOL_SIZE = int(os.getenv("TRENDYOL_DRIVER_POOL_SIZE", "2"))
+DRIVER_MAX_USES = int(os.getenv("TRENDYOL_DRIVER_MAX_USES", "50"))
+DRIVER_LEASE_TIMEOUT = 120.0
+SESSION_REFRESH_INTERVAL = float(os.getenv("TRENDYOL_SESSION_REFRESH_INTERVAL", "30"))
+SESSION_MAX_REFRESHES = int(os.getenv("TRENDYOL_SESSION_MAX_REFRESHES", "5"))
 PAGE_READY_SELECTOR = (By.CSS_SELECTOR, "div.p-card-wrppr")
+# Lean browsers skip what page_source and the card DOM never need: see BLOCKED_RESOURCE_PATTERNS.
+LEAN_BROWSER_ENABLED = os.getenv("TRENDYOL_LEAN_BROWSER", "1") != "0"
+LEAN_BROWSER_BLOCK = {
+    name.strip() for name in os.getenv("TRENDYOL_LEAN_BROWSER_BLOCK", "images,fonts,css,media,trackers").split(",")
+}
+BLOCKED_RESOURCE_PATTERNS = {
+    "images": ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "css": ["*.css"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3"],
+    "trackers": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*googleadservices.com*",
+        "*facebook.net*",
+        "*connect.facebook.com*",
+        "*hotjar.com*",
+        "*criteo.com*",
+        "*criteo.net*",
+        "*clarity.ms*",
+        "*tiktok.com*",
+        "*useinsider.com*",
+        "*adjust.com*",
+    ],
+}
+LEAN_BROWSER_ARGUMENTS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--no-first-run",
+    "--mute-audio",
+]
+PRODUCT_ID_RE = re.compile(r"p-(\d+)")
+BOUTIQUE_ID_RE = re.compile(r"boutiqueId=(\d+)")
+CARD_NAME_CLASS_RE = re.compile(r"prdct-desc-cntnr-name")
+CARD_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' p-card-wrppr ')]"
+CARD_NAME_XPATH = ".//span[contains(@class, 'prdct-desc-cntnr-name')]"
+CARD_PRICE_CLASS_RE = re.compile(r"prc-box-dscntd|prc-box-sllng|price-item")
+CARD_PRICE_XPATH = (
+    ".//*[contains(@class, 'prc-box-dscntd') or contains(@class, 'prc-box-sllng') or contains(@class, 'price-item')]"
+)
+READINESS_PROBE_SCRIPT = """
+if (!window.__tyProbe) {
+    const probe = {pending: 0, lastActivity: Date.now()};
+    const touch = () => { probe.lastActivity = Date.now(); };
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function () {
+            probe.pending += 1;
+            touch();
+            return originalFetch.apply(this, arguments).finally(() => { probe.pending -= 1; touch(); });
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        probe.pending += 1;
+        touch();
+        this.addEventListener("loadend", () => { probe.pending -= 1; touch(); });
+        return originalSend.apply(this, arguments);
+    };
+    new MutationObserver(touch).observe(document.documentElement, {childList: true, subtree: true});
+    window.__tyProbe = probe;
+}
+"""
+WAIT_FOR_CARDS_SCRIPT = """
+const [selector, previous, idleMs, timeoutMs, done] = arguments;
+const started = Date.now();
+let finished = false;
+let observer = null;
+let timer = null;
+const finish = (reason) => {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearInterval(timer);
+    done({count: document.querySelectorAll(selector).length, reason: reason});
+};
+const check = () => {
+    const count = document.querySelectorAll(selector).length;
+    const probe = window.__tyProbe || {pending: 0, lastActivity: 0};
+    if (count !== previous) { return finish("cards"); }
+    if (probe.pending <= 0 && Date.now() - Math.max(probe.lastActivity, started) >= idleMs) {
+        return finish("idle");
+    }
+    if (Date.now() - started >= timeoutMs) { finish("timeout"); }
+};
+observer = new MutationObserver(check);
+observer.observe(document.documentElement, {childList: true, subtree: true});
+timer = setInterval(check, 50);
+check();
+"""
+
 
+def blocked_resource_patterns(categories: Set[str] = LEAN_BROWSER_BLOCK) -> List[str]:
+    return [pattern for name in sorted(categories) for pattern in BLOCKED_RESOURCE_PATTERNS.get(name, [])]
 
-def create_driver(headless: bool = True) -> webdriver.Chrome:
+
+def create_driver(headless: bool = True, lean: bool = LEAN_BROWSER_ENABLED) -> webdriver.Chrome:
     options = Options()
     if headless:
         options.add_argument("--headless=new")
@@ -46,8 +206,191 @@ def create_driver(headless: bool = True) -> webdriver.Chrome:
     options.add_argument("--disable-gpu")
     options.add_argument("--window-size=1920,1080")
     options.add_argument(f"--user-agent={HEADERS['User-Agent']}")
+    if lean:
+        for argument in LEAN_BROWSER_ARGUMENTS:
+            options.add_argument(argument)
+        if "images" in LEAN_BROWSER_BLOCK:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        # Return from get() at DOMContentLoaded; callers wait for the elements or props they need.
+        options.page_load_strategy = "eager"
     service = Service()
-    return webdriver.Chrome(service=service, options=options)
+    driver = webdriver.Chrome(service=service, options=options)
+    if lean:
+        patterns = blocked_resource_patterns()
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception:
+            # Without CDP the flags and prefs above still apply.
+            pass
+    return driver
+
+
+class DriverPool:
+    def __init__(self, size: int = DRIVER_POOL_SIZE, headless: bool = True, max_uses: int = DRIVER_MAX_USES) -> None:
+        self.size = max(1, size)
+        self._headless = headless
+        self._max_uses = max(1, max_uses)
+        self._idle: List[webdriver.Chrome] = []
+        self._uses: Dict[int, int] = {}
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def active(self) -> int:
+        with self._cond:
+            return self._created - len(self._idle)
+
+    def warm(self, count: Optional[int] = None) -> int:
+        target = self.size if count is None else min(max(0, count), self.size)
+        started = 0
+        while True:
+            with self._cond:
+                if self._closed or self._created >= target:
+                    break
+                self._created += 1
+            try:
+                driver = create_driver(headless=self._headless)
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                break
+            with self._cond:
+                self._uses[id(driver)] = 0
+                self._idle.append(driver)
+                self._cond.notify()
+            started += 1
+        return started
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            driver: Optional[webdriver.Chrome] = None
+            with self._cond:
+                while not self._idle and self._created >= self.size:
+                    if self._closed:
+                        raise RuntimeError("Tarayıcı havuzu kapatıldı")
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Boşta tarayıcı bulunamadı")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("Tarayıcı havuzu kapatıldı")
+                if self._idle:
+                    driver = self._idle.pop()
+                else:
+                    self._created += 1
+            if driver is None:
+                try:
+                    driver = create_driver(headless=self._headless)
+                except Exception:
+                    self._forget(None)
+                    raise
+                with self._cond:
+                    self._uses[id(driver)] = 0
+                return driver
+            if self._is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def release(self, driver: webdriver.Chrome, discard: bool = False) -> None:
+        with self._cond:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+            closed = self._closed
+        if discard or closed or uses >= self._max_uses or not self._reset(driver):
+            self._discard(driver)
+            return
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[webdriver.Chrome]:
+        driver = self.acquire(timeout=timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = not self._is_healthy(driver)
+            raise
+        finally:
+            self.release(driver, discard=failed)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def _is_healthy(self, driver: webdriver.Chrome) -> bool:
+        try:
+            driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, driver: webdriver.Chrome) -> bool:
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver: webdriver.Chrome) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._forget(driver)
+
+    def _forget(self, driver: Optional[webdriver.Chrome]) -> None:
+        with self._cond:
+            if driver is not None:
+                self._uses.pop(id(driver), None)
+            self._created -= 1
+            self._cond.notify()
+
+
+_driver_pools: Dict[bool, DriverPool] = {}
+_driver_pools_lock = threading.Lock()
+
+
+def get_driver_pool(headless: bool = True) -> DriverPool:
+    with _driver_pools_lock:
+        pool = _driver_pools.get(headless)
+        if pool is None:
+            pool = DriverPool(headless=headless)
+            _driver_pools[headless] = pool
+        return pool
+
+
+def active_driver_count() -> int:
+    with _driver_pools_lock:
+        pools = list(_driver_pools.values())
+    return sum(pool.active for pool in pools)
+
+
+def close_driver_pools() -> None:
+    with _driver_pools_lock:
+        pools = list(_driver_pools.values())
+        _driver_pools.clear()
+    for pool in pools:
+        pool.close()
 
 
 def slugify(value: str) -> str:
@@ -88,6 +431,59 @@ def extract_props_json(html: str, pattern: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+_json_decoder = json.JSONDecoder()
+
+
+def decode_json_at(html: str, start: int) -> Optional[Any]:
+    length = len(html)
+    while start < length and html[start] in " \t\r\n=":
+        start += 1
+    if start >= length or html[start] != "{":
+        return None
+    if orjson is not None:
+        end = html.find("</script>", start)
+        if end != -1:
+            try:
+                return orjson.loads(html[start:end].rstrip().rstrip(";"))
+            except orjson.JSONDecodeError:
+                pass
+    try:
+        value, _ = _json_decoder.raw_decode(html, start)
+    except ValueError:
+        return None
+    return value
+
+
+def extract_marker_json(html: str, marker: str) -> Optional[Dict[str, Any]]:
+    if not html:
+        return None
+    index = html.find(marker)
+    if index == -1:
+        return None
+    value = decode_json_at(html, index + len(marker))
+    return value if isinstance(value, dict) else None
+
+
+def extract_envoy_props(html: str, names: List[str]) -> Dict[str, Dict[str, Any]]:
+    found: Dict[str, Dict[str, Any]] = {}
+    if not html:
+        return found
+    wanted = set(names)
+    position = html.find(ENVOY_PROPS_PREFIX)
+    while position != -1 and len(found) < len(wanted):
+        name_start = position + len('window["')
+        name_end = html.find('"]', name_start)
+        if name_end == -1:
+            break
+        name = html[name_start:name_end]
+        if name in wanted and name not in found:
+            value = decode_json_at(html, name_end + 2)
+            if isinstance(value, dict):
+                found[name] = value
+        position = html.find(ENVOY_PROPS_PREFIX, name_end)
+    return found
+
+
 def collect_image_urls(image_payload: Any) -> List[str]:
     images: List[str] = []
     if isinstance(image_payload, list):
@@ -213,7 +609,7 @@ def build_other_merchant(other: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 
 
 def parse_product_detail(html: str) -> Dict[str, Any]:
-    data = extract_props_json(html, DETAIL_SCRIPT_PATTERN)
+    data = extract_envoy_props(html, [DETAIL_PROPS_NAME]).get(DETAIL_PROPS_NAME)
     if not data:
         return {}
 
@@ -240,36 +636,178 @@ def parse_product_detail(html: str) -> Dict[str, Any]:
     return {"general": general, "merchants": merchants}
 
 
+def is_challenge_response(response: requests.Response, props_names: List[str]) -> bool:
+    # Refusals and 200 pages without the embedded props (bot checks, consent walls) alike.
+    if response.status_code == 403:
+        return True
+    return response.status_code == 200 and not any(name in response.text for name in props_names)
+
+
+class SessionRefresher:
+    """Re-seeds a job's requests session with cookies from one browser visit once Trendyol starts
+    challenging it, so fetches return to HTTP instead of staying on the Selenium fallback.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        driver_pool: DriverPool,
+        trace: Any = NULL_TRACE,
+        min_interval: float = SESSION_REFRESH_INTERVAL,
+        max_refreshes: int = SESSION_MAX_REFRESHES,
+    ) -> None:
+        self.session = session
+        self.trace = trace
+        self.min_interval = min_interval
+        self.max_refreshes = max_refreshes
+        # Bumped on every refresh; callers pass the value they saw before their request.
+        self.generation = 0
+        self._pool = driver_pool
+        self._lock = threading.Lock()
+        self._refreshes = 0
+        self._last_refresh = float("-inf")
+
+    def refresh(self, url: str, seen_generation: int) -> bool:
+        # The lock makes concurrent challenged workers wait for one visit instead of each starting one.
+        with self._lock:
+            if self.generation != seen_generation:
+                return True
+            now = time.monotonic()
+            if self._refreshes >= self.max_refreshes or now - self._last_refresh < self.min_interval:
+                SESSION_REFRESHES.inc(outcome="skipped")
+                return False
+            self._refreshes += 1
+            self._last_refresh = now
+            try:
+                with self.trace.span("session refresh", "session", url=url), self._pool.lease(
+                    timeout=DRIVER_LEASE_TIMEOUT
+                ) as driver:
+                    driver.get(url)
+                    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+                    sync_driver_cookies(driver, self.session)
+            except Exception:
+                SESSION_REFRESHES.inc(outcome="failed")
+                return False
+            self.generation += 1
+            SESSION_REFRESHES.inc(outcome="refreshed")
+            return True
+
+
 class ProductDetailFetcher:
-    def __init__(self, session: requests.Session, headless: bool = True) -> None:
+    def __init__(
+        self,
+        session: requests.Session,
+        headless: bool = True,
+        driver_pool: Optional[DriverPool] = None,
+        seller_cache: Optional[SellerCache] = None,
+        page_cache: Optional[PageCache] = None,
+        trace: Any = None,
+        archive: Optional[PageArchive] = None,
+        rate_limiter: Any = None,
+        session_refresher: Optional[SessionRefresher] = None,
+    ) -> None:
         self.session = session
-        self._driver: Optional[webdriver.Chrome] = None
-        self._headless = headless
-        self._seller_cache: Dict[int, Dict[str, Any]] = {}
+        self.trace = trace or NULL_TRACE
+        self.archive = archive
+        self._rate_limiter = rate_limiter or get_rate_limiter()
+        self._pool = driver_pool or get_driver_pool(headless)
+        self._session_refresher = session_refresher or SessionRefresher(session, self._pool, self.trace)
+        if archive is not None and seller_cache is None:
+            # A job-local cache: capture must record every seller page the job needs, and replay
+            # must not overwrite the shared cache with details parsed from old pages.
+            seller_cache = SellerCache(path=None)
+        self._seller_cache = seller_cache or get_seller_cache()
+        self._page_cache = page_cache or get_page_cache()
 
-    def _get_driver(self) -> webdriver.Chrome:
-        if self._driver is None:
-            self._driver = create_driver(headless=self._headless)
-        return self._driver
+    def _fetch_with_driver(self, url: str, props_names: Optional[List[str]] = None) -> str:
+        with self._pool.lease(timeout=DRIVER_LEASE_TIMEOUT) as driver:
+            driver.get(url)
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            if not (LEAN_BROWSER_ENABLED and props_names and wait_for_props(driver, props_names)):
+                time.sleep(1.0)
+            return driver.page_source
 
-    def fetch_page(self, url: str) -> Optional[str]:
+    def _http_get(
+        self, kind: str, url: str, timeout: float, props_names: List[str], headers: Optional[Dict[str, str]] = None
+    ) -> Optional[requests.Response]:
+        # A challenged response gets one retry after the session's cookies are refreshed.
+        response = None
+        for attempt in range(2):
+            generation = self._session_refresher.generation
+            try:
+                self._rate_limiter.acquire(url)
+                timer = DETAIL_HTTP_SECONDS.time() if kind == "detail" else nullcontext()
+                with self.trace.span(f"{kind} http", "fetch", url=url, attempt=attempt) as span, timer:
+                    response = self.session.get(url, timeout=timeout, headers=headers)
+                    span["status"] = response.status_code
+                    span["bytes"] = len(response.content)
+            except requests.RequestException:
+                HTTP_RESPONSES.inc(kind=kind, status="error")
+                self._rate_limiter.observe(url, None)
+                return None
+            HTTP_RESPONSES.inc(kind=kind, status=response.status_code)
+            challenged = is_challenge_response(response, props_names)
+            self._rate_limiter.observe(
+                url,
+                response.status_code,
+                response.elapsed.total_seconds(),
+                blocked=challenged,
+                retry_after=response.headers.get("Retry-After"),
+            )
+            if not challenged or attempt or not self._session_refresher.refresh(url, generation):
+                break
+        return response
+
+    def fetch_page(self, url: str, product_id: Optional[str] = None) -> Optional[str]:
         if not url:
             return None
-        try:
-            response = self.session.get(url, timeout=20)
-            if response.ok and "__envoy_flash-sales-banner__PROPS" in response.text:
+        archive_key = product_id or url
+        if self.archive is not None and self.archive.replaying:
+            return self.archive.lookup("detail", archive_key)
+        html = self._fetch_page(url, product_id)
+        if self.archive is not None and html:
+            self.archive.record("detail", archive_key, url, html)
+        return html
+
+    def _fetch_page(self, url: str, product_id: Optional[str]) -> Optional[str]:
+        cache_key = f"{product_id}|{url}" if product_id else url
+        cached = self._page_cache.lookup(cache_key) if self._page_cache else None
+        if cached and self._page_cache.is_fresh(cached):
+            return cached.body
+        headers: Dict[str, str] = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        response = self._http_get("detail", url, 20, [DETAIL_PROPS_NAME], headers or None)
+        if response is not None:
+            if response.status_code == 304 and cached:
+                self._page_cache.revalidated(cache_key)
+                PAGE_FETCHES.inc(kind="detail", method="http")
+                return cached.body
+            if response.ok and DETAIL_PROPS_NAME in response.text:
+                if self._page_cache:
+                    self._page_cache.store(
+                        cache_key,
+                        url,
+                        response.text,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                    )
+                PAGE_FETCHES.inc(kind="detail", method="http")
                 return response.text
-        except requests.RequestException:
-            pass
 
+        BROWSER_FALLBACKS.inc(kind="detail")
+        PAGE_FETCHES.inc(kind="detail", method="browser")
         try:
-            driver = self._get_driver()
-            driver.get(url)
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(1.0)
-            return driver.page_source
+            with self.trace.span("detail browser", "fetch", url=url) as span, BROWSER_FETCH_SECONDS.time(kind="detail"):
+                html = self._fetch_with_driver(url, [DETAIL_PROPS_NAME])
+                span["chars"] = len(html)
         except Exception:
             return None
+        if self._page_cache and DETAIL_PROPS_NAME in html:
+            self._page_cache.store(cache_key, url, html)
+        return html
 
     def fetch_seller_details(
         self,
@@ -279,34 +817,50 @@ class ProductDetailFetcher:
     ) -> Dict[str, Any]:
         if merchant_id is None:
             return {}
-        if merchant_id in self._seller_cache:
-            return self._seller_cache[merchant_id]
+        cached = self._seller_cache.get(merchant_id)
+        SELLER_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+        if cached is not None:
+            return cached
+        with self.trace.span("seller lookup", "seller", merchant_id=merchant_id), SELLER_FETCH_SECONDS.time():
+            return self._fetch_seller_details(merchant_id, merchant_name, merchant_link)
+
+    def _fetch_seller_details(
+        self, merchant_id: Any, merchant_name: Optional[str], merchant_link: Optional[str]
+    ) -> Dict[str, Any]:
         link = ensure_absolute_url(merchant_link)
         if not link:
             fallback_link = build_seller_link(merchant_name, merchant_id)
             link = ensure_absolute_url(fallback_link) or fallback_link
         if not link or link == "N/A":
-            self._seller_cache[merchant_id] = {}
+            self._seller_cache.set(merchant_id, {})
             return {}
+        if self.archive is not None and self.archive.replaying:
+            html = self.archive.lookup("seller", str(merchant_id))
+            if html is None:
+                return {}
+            return self._parse_seller_details(merchant_id, html)
         html = None
-        try:
-            response = self.session.get(link, timeout=12)
-            if response.ok:
-                html = response.text
-        except requests.RequestException:
-            pass
+        response = self._http_get("seller", link, 12, SELLER_PROPS_NAMES)
+        if response is not None and response.ok:
+            html = response.text
+            PAGE_FETCHES.inc(kind="seller", method="http")
         if html is None:
+            BROWSER_FALLBACKS.inc(kind="seller")
+            PAGE_FETCHES.inc(kind="seller", method="browser")
             try:
-                driver = self._get_driver()
-                driver.get(link)
-                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                time.sleep(1.0)
-                html = driver.page_source
+                with self.trace.span("seller browser", "fetch", url=link), BROWSER_FETCH_SECONDS.time(kind="seller"):
+                    html = self._fetch_with_driver(link, SELLER_PROPS_NAMES)
             except Exception:
-                self._seller_cache[merchant_id] = {}
+                # A busy pool or a crashed browser says nothing about the seller, so nothing is cached.
                 return {}
-        for pattern in SELLER_PROPS_PATTERNS:
-            props = extract_props_json(html, pattern)
+        if self.archive is not None:
+            self.archive.record("seller", str(merchant_id), link, html)
+        return self._parse_seller_details(merchant_id, html)
+
+    def _parse_seller_details(self, merchant_id: Any, html: str) -> Dict[str, Any]:
+        props_by_name = extract_envoy_props(html, SELLER_PROPS_NAMES)
+        for name in SELLER_PROPS_NAMES:
+            props = props_by_name.get(name)
             if props:
                 seller = props.get("seller") or props.get("merchant") or {}
                 corporate = seller.get("corporateInfo") or {}
@@ -316,30 +870,70 @@ class ProductDetailFetcher:
                     "registeredEmailAddress": corporate.get("registeredEmail"),
                     "taxNumber": corporate.get("taxNumber") or seller.get("taxNumber"),
                 }
-                self._seller_cache[merchant_id] = details
+                self._seller_cache.set(merchant_id, details)
                 return details
-        self._seller_cache[merchant_id] = {}
+        self._seller_cache.set(merchant_id, {})
         return {}
 
     def close(self) -> None:
-        if self._driver:
-            self._driver.quit()
-            self._driver = None
+        # Fallback browsers are leased per page and already returned to the pool.
+        pass
+
 
+def wait_for_props(driver: webdriver.Chrome, names: List[str], timeout: float = 5.0) -> bool:
+    # The envoy props are inline scripts, so with the eager load strategy they are usually
+    # already assigned when get() returns; this replaces the fixed pause for them.
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda current: current.execute_script(
+                "return arguments[0].some((name) => window[name] !== undefined);", names
+            )
+        )
+        return True
+    except Exception:
+        return False
+
+
+def wait_for_cards_change(driver: webdriver.Chrome, previous: int) -> Dict[str, Any]:
+    try:
+        driver.execute_script(READINESS_PROBE_SCRIPT)
+        result = driver.execute_async_script(
+            WAIT_FOR_CARDS_SCRIPT,
+            PAGE_READY_SELECTOR[1],
+            previous,
+            READY_IDLE_MS,
+            int(READY_TIMEOUT_SECONDS * 1000),
+        )
+        if isinstance(result, dict):
+            return result
+    except Exception:
+        pass
+    # Pages that reject the probe fall back to the old fixed pause.
+    time.sleep(SCROLL_PAUSE_SECONDS)
+    return {"count": len(driver.find_elements(*PAGE_READY_SELECTOR)), "reason": "sleep"}
 
-def load_all_results(driver: webdriver.Chrome) -> None:
+
+def load_all_results(driver: webdriver.Chrome, trace: Any = NULL_TRACE) -> Dict[str, Any]:
+    started = time.perf_counter()
+    rounds: List[Dict[str, Any]] = []
     stagnation = 0
     last_count = 0
-    for _ in range(MAX_SCROLL_ROUNDS):
-        try:
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located(PAGE_READY_SELECTOR))
-        except Exception:
-            time.sleep(SCROLL_PAUSE_SECONDS)
-        cards = driver.find_elements(By.CSS_SELECTOR, "div.p-card-wrppr")
-        count = len(cards)
+    try:
+        driver.set_script_timeout(READY_TIMEOUT_SECONDS + 5)
+        driver.execute_script(READINESS_PROBE_SCRIPT)
+    except Exception:
+        pass
+    for index in range(MAX_SCROLL_ROUNDS):
+        round_started = time.perf_counter()
+        count = len(driver.find_elements(*PAGE_READY_SELECTOR))
         if count == 0:
-            time.sleep(SCROLL_PAUSE_SECONDS)
-            continue
+            count = int(wait_for_cards_change(driver, 0).get("count") or 0)
+            if count == 0:
+                rounds.append(
+                    {"round": index, "seconds": time.perf_counter() - round_started, "cards": 0, "reason": "empty"}
+                )
+                trace.add("scroll round", "scroll", round_started, rounds[-1]["seconds"], **rounds[-1])
+                continue
         if count == last_count:
             stagnation += 1
         else:
@@ -348,14 +942,54 @@ def load_all_results(driver: webdriver.Chrome) -> None:
         if stagnation >= STAGNATION_LIMIT:
             break
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(SCROLL_PAUSE_SECONDS)
+        outcome = wait_for_cards_change(driver, count)
         try:
             load_more = driver.find_element(By.CSS_SELECTOR, "div.infinite-scroll button")
             if load_more.is_displayed():
                 driver.execute_script("arguments[0].click();", load_more)
-                time.sleep(1.0)
+                outcome = wait_for_cards_change(driver, int(outcome.get("count") or count))
         except Exception:
             pass
+        rounds.append(
+            {
+                "round": index,
+                "seconds": time.perf_counter() - round_started,
+                "cards": int(outcome.get("count") or count),
+                "reason": outcome.get("reason"),
+            }
+        )
+        trace.add("scroll round", "scroll", round_started, rounds[-1]["seconds"], **rounds[-1])
+    return {"seconds": time.perf_counter() - started, "cards": last_count, "rounds": rounds}
+
+
+def build_card_product(
+    product_id: str,
+    url_path: str,
+    product_name: str,
+    image_url: Optional[str],
+    card_price: Optional[str] = None,
+) -> Dict[str, Any]:
+    url_full = url_path if url_path.startswith("http") else f"{BASE_URL}{url_path}"
+    boutique_match = BOUTIQUE_ID_RE.search(url_full)
+    return {
+        "product_id": product_id,
+        "product_name": product_name,
+        "product_url": url_full,
+        "category_id": boutique_match.group(1) if boutique_match else "N/A",
+        "image_url": image_url,
+        "card_price": card_price or None,
+    }
+
+
+def listing_signal(product: Dict[str, Any]) -> str:
+    # What a search card shows about a product; a change means its detail page is worth refetching.
+    fields = [product.get(key) for key in ("product_name", "product_url", "image_url", "card_price")]
+    return hashlib.sha1(json.dumps(fields, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def card_product_id(url_path: str) -> Optional[str]:
+    product_id_match = PRODUCT_ID_RE.search(url_path)
+    return product_id_match.group(1) if product_id_match else None
 
 
 def collect_products_from_cards(
@@ -369,45 +1003,239 @@ def collect_products_from_cards(
         if not link_elem:
             continue
         url_path = link_elem["href"]
-        url_full = url_path if url_path.startswith("http") else f"{BASE_URL}{url_path}"
-        product_id_match = re.search(r"p-(\d+)", url_full)
-        product_id = product_id_match.group(1) if product_id_match else None
+        product_id = card_product_id(url_path)
         if not product_id or product_id in seen_ids:
             continue
         seen_ids.add(product_id)
-        name_elem = card.find("span", class_=re.compile(r"prdct-desc-cntnr-name"))
+        name_elem = card.find("span", class_=CARD_NAME_CLASS_RE)
         product_name = name_elem.get_text(strip=True) if name_elem else link_elem.get_text(strip=True)
         image_elem = card.find("img")
         image_url = image_elem.get("data-src") or image_elem.get("src") if image_elem else None
-        boutique_match = re.search(r"boutiqueId=(\d+)", url_full)
-        category_id = boutique_match.group(1) if boutique_match else "N/A"
+        price_elem = card.find(class_=CARD_PRICE_CLASS_RE)
+        card_price = price_elem.get_text(strip=True) if price_elem else None
+        products.append(build_card_product(product_id, url_path, product_name, image_url, card_price))
+    return products
+
+
+def _lxml_text(element: Any) -> str:
+    return "".join(fragment.strip() for fragment in element.itertext())
+
+
+def collect_products_from_html(html: str, seen_ids: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+    if seen_ids is None:
+        seen_ids = set()
+    if not html:
+        return []
+    if lxml_html is None:
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("div", class_="p-card-wrppr"))
+        return collect_products_from_cards(soup, seen_ids)
+    try:
+        document = lxml_html.fromstring(html)
+    except (ValueError, TypeError):
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("div", class_="p-card-wrppr"))
+        return collect_products_from_cards(soup, seen_ids)
+    products: List[Dict[str, Any]] = []
+    for card in document.xpath(CARD_XPATH):
+        link_elem = card.find(".//a[@href]")
+        if link_elem is None:
+            continue
+        url_path = link_elem.get("href")
+        product_id = card_product_id(url_path)
+        if not product_id or product_id in seen_ids:
+            continue
+        seen_ids.add(product_id)
+        name_matches = card.xpath(CARD_NAME_XPATH)
+        product_name = _lxml_text(name_matches[0]) if name_matches else _lxml_text(link_elem)
+        image_elem = card.find(".//img")
+        image_url = image_elem.get("data-src") or image_elem.get("src") if image_elem is not None else None
+        price_matches = card.xpath(CARD_PRICE_XPATH)
+        card_price = _lxml_text(price_matches[0]) if price_matches else None
+        products.append(build_card_product(product_id, url_path, product_name, image_url, card_price))
+    return products
+
+
+def extract_search_state_products(state: Optional[Dict[str, Any]]) -> List[Any]:
+    if not isinstance(state, dict):
+        return []
+    items = state.get("products")
+    if not items:
+        items = (state.get("searchResult") or {}).get("products")
+    return items if isinstance(items, list) else []
+
+
+def collect_products_from_state(
+    items: List[Any], seen_ids: Optional[Set[str]] = None
+) -> List[Dict[str, Any]]:
+    products: List[Dict[str, Any]] = []
+    if seen_ids is None:
+        seen_ids = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        url_full = ensure_absolute_url(item.get("url"))
+        if not url_full:
+            continue
+        product_id = str(item.get("id") or "") or card_product_id(url_full)
+        if not product_id or product_id in seen_ids:
+            continue
+        seen_ids.add(product_id)
+        images = item.get("images") or []
+        image_url = images[0] if images and isinstance(images[0], str) else None
+        if image_url and image_url.startswith("/"):
+            image_url = f"{IMAGE_CDN_URL}{image_url}"
+        price = item.get("price")
+        if isinstance(price, dict):
+            price = price.get("discountedPrice") or price.get("sellingPrice") or price.get("originalPrice")
+        boutique_match = BOUTIQUE_ID_RE.search(url_full)
         products.append(
             {
                 "product_id": product_id,
-                "product_name": product_name,
+                "product_name": item.get("name") or item.get("imageAlt") or "N/A",
                 "product_url": url_full,
-                "category_id": category_id,
+                "category_id": boutique_match.group(1) if boutique_match else "N/A",
                 "image_url": image_url,
+                "card_price": str(price) if price not in (None, "") else None,
             }
         )
     return products
 
 
-def enrich_merchant_with_seller(fetcher: ProductDetailFetcher, merchant: Dict[str, Any]) -> Dict[str, Any]:
-    fields_to_check = ("officialName", "cityName", "registeredEmailAddress", "taxNumber")
-    needs_enrichment = any(merchant.get(field) in (None, "N/A") for field in fields_to_check)
+def collect_products_from_search_html(html: str, seen_ids: Set[str]) -> Optional[List[Dict[str, Any]]]:
+    # None means the page is not a results page at all (a challenge or error page). A results page
+    # without products, such as the one after the last page, is a valid empty list.
+    state = extract_marker_json(html, SEARCH_STATE_MARKER)
+    items = extract_search_state_products(state)
+    if items:
+        return collect_products_from_state(items, seen_ids)
+    products = collect_products_from_html(html, seen_ids)
+    if products or state is not None:
+        return products
+    return None
+
+
+def fetch_search_products_http(
+    session: requests.Session, page_url: str, seen_ids: Set[str], archive: Optional[PageArchive] = None
+) -> Optional[List[Dict[str, Any]]]:
+    rate_limiter = get_rate_limiter()
+    rate_limiter.acquire(page_url)
+    try:
+        response = session.get(page_url, timeout=20)
+    except requests.RequestException:
+        HTTP_RESPONSES.inc(kind="search", status="error")
+        rate_limiter.observe(page_url, None)
+        return None
+    HTTP_RESPONSES.inc(kind="search", status=response.status_code)
+    rate_limiter.observe(
+        page_url,
+        response.status_code,
+        response.elapsed.total_seconds(),
+        retry_after=response.headers.get("Retry-After"),
+    )
+    if not response.ok:
+        return None
+    html = response.text
+    if archive is not None:
+        archive.record("search", page_url, page_url, html)
+    return collect_products_from_search_html(html, seen_ids)
+
+
+def fetch_search_products_with_driver(
+    driver: webdriver.Chrome,
+    page_url: str,
+    seen_ids: Set[str],
+    trace: Any = NULL_TRACE,
+    archive: Optional[PageArchive] = None,
+) -> List[Dict[str, Any]]:
+    driver.get(page_url)
+    try:
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located(PAGE_READY_SELECTOR))
+    except TimeoutException:
+        # No cards at all: past the last page or a query without results, nothing to scroll.
+        timing = None
+    else:
+        timing = load_all_results(driver, trace)
+    if timing is not None:
+        SCROLL_ROUNDS.observe(len(timing["rounds"]))
+        SCROLL_SECONDS.observe(timing["seconds"])
+    html = driver.page_source
+    if archive is not None:
+        archive.record("search browser", page_url, page_url, html)
+    return collect_products_from_html(html, seen_ids)
+
+
+def sync_driver_cookies(driver: webdriver.Chrome, session: requests.Session) -> None:
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"])
+
+
+def replay_search_page(archive: PageArchive, page_url: str) -> List[Dict[str, Any]]:
+    # Mirrors load_search_page: the HTTP copy first, then the page the browser fallback saw.
+    page_seen: Set[str] = set()
+    html = archive.lookup("search", page_url)
+    page_products = collect_products_from_search_html(html, page_seen) if html else None
+    if page_products is None:
+        html = archive.lookup("search browser", page_url)
+        page_products = collect_products_from_html(html, page_seen) if html else []
+    return page_products
+
+
+def load_search_page(
+    session: requests.Session,
+    driver_pool: DriverPool,
+    page_url: str,
+    trace: Any = NULL_TRACE,
+    archive: Optional[PageArchive] = None,
+) -> List[Dict[str, Any]]:
+    if archive is not None and archive.replaying:
+        with trace.span("search page replay", "search", url=page_url) as span:
+            page_products = replay_search_page(archive, page_url)
+            span["products"] = len(page_products)
+        return page_products
+    page_seen: Set[str] = set()
+    page_products = None
+    if HTTP_SEARCH_ENABLED:
+        with trace.span("search page http", "search", url=page_url) as span, SEARCH_PAGE_SECONDS.time(method="http"):
+            page_products = fetch_search_products_http(session, page_url, page_seen, archive)
+            span["products"] = None if page_products is None else len(page_products)
+        if page_products is not None:
+            PAGE_FETCHES.inc(kind="search", method="http")
+    if page_products is None:
+        if HTTP_SEARCH_ENABLED:
+            BROWSER_FALLBACKS.inc(kind="search")
+        PAGE_FETCHES.inc(kind="search", method="browser")
+        with trace.span("search page browser", "search", url=page_url) as span, SEARCH_PAGE_SECONDS.time(
+            method="browser"
+        ), driver_pool.lease(timeout=DRIVER_LEASE_TIMEOUT) as driver:
+            page_products = fetch_search_products_with_driver(driver, page_url, page_seen, trace, archive)
+            sync_driver_cookies(driver, session)
+            span["products"] = len(page_products)
+    return page_products
+
+
+# Plain merchant dicts from parse_product_detail or ResultRecord rows from the pipeline.
+MutableRow = Union[Dict[str, Any], ResultRecord]
+
+
+def merchant_needs_enrichment(merchant: Mapping[str, Any]) -> bool:
     if merchant.get("Merchant Type") == "Other":
-        needs_enrichment = True
-    if not needs_enrichment:
-        return merchant
+        return True
+    fields_to_check = ("officialName", "cityName", "registeredEmailAddress", "taxNumber")
+    return any(merchant.get(field) in (None, "N/A") for field in fields_to_check)
+
+
+def request_seller_details(fetcher: ProductDetailFetcher, merchant: Mapping[str, Any]) -> Dict[str, Any]:
     existing_link = merchant.get("sellerLink")
-    additional = fetcher.fetch_seller_details(
+    return fetcher.fetch_seller_details(
         merchant.get("Merchant ID"),
         merchant.get("Merchant Name"),
         existing_link if isinstance(existing_link, str) else None,
     )
+
+
+def apply_seller_details(merchant: MutableRow, additional: Dict[str, Any]) -> MutableRow:
     if not additional:
         return merchant
+    existing_link = merchant.get("sellerLink")
     normalized_link = ensure_absolute_url(existing_link)
     if not normalized_link:
         fallback_link = build_seller_link(merchant.get("Merchant Name"), merchant.get("Merchant ID"))
@@ -426,12 +1254,219 @@ def enrich_merchant_with_seller(fetcher: ProductDetailFetcher, merchant: Dict[st
     return merchant
 
 
+def enrich_merchant_with_seller(fetcher: ProductDetailFetcher, merchant: Dict[str, Any]) -> Dict[str, Any]:
+    if not merchant_needs_enrichment(merchant):
+        return merchant
+    return apply_seller_details(merchant, request_seller_details(fetcher, merchant))
+
+
+class SellerEnricher:
+    def __init__(self, fetcher: ProductDetailFetcher, workers: int = SELLER_CONCURRENCY) -> None:
+        self._fetcher = fetcher
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="seller-worker")
+        self._futures: Dict[Any, "Future[Dict[str, Any]]"] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def request(self, merchant: Mapping[str, Any]) -> Optional["Future[Dict[str, Any]]"]:
+        if merchant.get("Merchant Type") not in ("Primary", "Other") or not merchant_needs_enrichment(merchant):
+            return None
+        merchant_id = merchant.get("Merchant ID")
+        with self._lock:
+            self.requests += 1
+            # Single flight: every row of the same merchant waits on the first lookup.
+            future = self._futures.get(merchant_id)
+            if future is None:
+                future = self._executor.submit(request_seller_details, self._fetcher, dict(merchant))
+                self._futures[merchant_id] = future
+        return future
+
+    @property
+    def distinct_merchants(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def fetch_product_records(
+    fetcher: ProductDetailFetcher, product: Dict[str, Any], enrich: bool = True
+) -> List[ResultRecord]:
+    detail_html = fetcher.fetch_page(product["product_url"], product.get("product_id"))
+    with fetcher.trace.span("parse detail", "parse", product_id=product.get("product_id")):
+        parsed = parse_product_detail(detail_html or "")
+    merchants = parsed.get("merchants", [])
+    if enrich:
+        merchants = [enrich_merchant_with_seller(fetcher, merchant) for merchant in merchants]
+    return records_from_detail(product, parsed.get("general", {}), merchants)
+
+
+def build_product_rows(
+    fetcher: ProductDetailFetcher, product: Dict[str, Any], enrich: bool = True
+) -> List[Dict[str, Any]]:
+    return [record.to_dict() for record in fetch_product_records(fetcher, product, enrich)]
+
+
+class DetailPipeline:
+    def __init__(
+        self,
+        fetcher: ProductDetailFetcher,
+        workers: int,
+        on_progress: Optional[Callable[[int, int, bool], None]] = None,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        seller_workers: int = SELLER_CONCURRENCY,
+        row_sink: Optional[Callable[[ResultRecord], None]] = None,
+    ) -> None:
+        self._fetcher = fetcher
+        self._enricher = SellerEnricher(fetcher, seller_workers)
+        self._on_progress = on_progress
+        self._row_sink = row_sink
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._results: Dict[int, Tuple[List[ResultRecord], List[Tuple[ResultRecord, Future]]]] = {}
+        self._rows: List[ResultRecord] = []
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._submitted = 0
+        self._completed = 0
+        self._emitted_rows = 0
+        self._listing_done = False
+        self._workers_done = False
+        self._error: Optional[BaseException] = None
+        self._threads = [
+            threading.Thread(target=self._work, name=f"detail-worker-{index}", daemon=True)
+            for index in range(max(1, workers))
+        ]
+        self._emitter = threading.Thread(target=self._emit_in_order, name="detail-emitter", daemon=True)
+
+    @property
+    def submitted(self) -> int:
+        return self._submitted
+
+    @property
+    def emitted_rows(self) -> int:
+        return self._emitted_rows
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+        self._emitter.start()
+
+    def submit(self, product: Dict[str, Any], records: Optional[List[ResultRecord]] = None) -> None:
+        # records are carried-forward rows of an unchanged product; they keep their place in the output.
+        with self._lock:
+            index = self._submitted
+            self._submitted += 1
+        # Blocks while the workers are behind, which throttles the search producer.
+        self._queue.put((index, product, records))
+
+    def close(self) -> List[ResultRecord]:
+        with self._lock:
+            self._listing_done = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        with self._ready:
+            self._workers_done = True
+            self._ready.notify_all()
+        self._emitter.join()
+        self._enricher.close()
+        if self._error is not None:
+            raise self._error
+        return self._rows
+
+    def _fail(self, exc: BaseException) -> None:
+        with self._ready:
+            if self._error is None:
+                self._error = exc
+            self._ready.notify_all()
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            index, product, records = item
+            if self._error is not None:
+                continue
+            try:
+                if records is not None:
+                    product_rows, pending = records, []
+                    self._store_result(index, product_rows, pending)
+                    continue
+                with self._fetcher.trace.span("product", "product", product_id=product.get("product_id")):
+                    product_rows = fetch_product_records(self._fetcher, product, enrich=False)
+                pending = []
+                for row in product_rows:
+                    future = self._enricher.request(row)
+                    if future is not None:
+                        pending.append((row, future))
+            except Exception as exc:  # surfaced to the caller from close()
+                self._fail(exc)
+                continue
+            self._store_result(index, product_rows, pending)
+
+    def _store_result(
+        self, index: int, product_rows: List[ResultRecord], pending: List[Tuple[ResultRecord, Future]]
+    ) -> None:
+        with self._ready:
+            self._results[index] = (product_rows, pending)
+            self._completed += 1
+            self._ready.notify_all()
+            if self._on_progress:
+                self._on_progress(self._completed, self._submitted, self._listing_done)
+
+    def _emit_in_order(self) -> None:
+        index = 0
+        while True:
+            with self._ready:
+                while (
+                    index not in self._results
+                    and self._error is None
+                    and not (self._workers_done and index >= self._submitted)
+                ):
+                    self._ready.wait()
+                if self._error is not None or index not in self._results:
+                    return
+                product_rows, pending = self._results.pop(index)
+            try:
+                for row, future in pending:
+                    apply_seller_details(row, future.result())
+                for row in product_rows:
+                    if self._row_sink is not None:
+                        self._row_sink(row)
+                    else:
+                        self._rows.append(row)
+                    self._emitted_rows += 1
+            except Exception as exc:  # surfaced to the caller from close()
+                self._fail(exc)
+                return
+            index += 1
+
+
 def search_trendyol(
     query: str,
     headless: bool = True,
     progress_callback: Optional[Callable[[int, int, str, str], None]] = None,
     max_pages: Optional[int] = None,
-) -> List[Dict[str, Any]]:
+    detail_concurrency: Optional[int] = None,
+    row_sink: Optional[Callable[[ResultRecord], None]] = None,
+    incremental: bool = False,
+    trace: Any = None,
+    archive: Optional[PageArchive] = None,
+) -> List[ResultRecord]:
+    # Rows are read-only-keyed ResultRecord mappings over the usual output columns. With a row_sink,
+    # they are streamed to it in search order and not kept in the returned list.
+    # In incremental mode only products whose search card changed since the previous run of the
+    # query are fetched; the others reuse that run's rows. A job_trace.JobTrace passed as trace
+    # collects spans for search pages, scroll rounds, fetches, parsing and seller lookups.
+    # A page_archive.PageArchive records every fetched page, or with replay=True supplies them
+    # all, so a replayed search re-runs parsing and enrichment without touching the network.
     def notify(current: int, total: int, stage: str, message: str) -> None:
         if progress_callback:
             try:
@@ -441,117 +1476,156 @@ def search_trendyol(
 
     notify(0, 0, "initializing", "Arama hazırlanıyor")
     encoded_query = quote_plus(query)
-    base_search_url = SEARCH_URL_TEMPLATE.format(query=encoded_query)
+    replaying = archive is not None and archive.replaying
+    search_url_template = SEARCH_URL_TEMPLATE
+    if replaying:
+        # Search pages are archived by URL; rebuild them against the host the capture ran on.
+        search_url_template = SEARCH_URL_TEMPLATE.replace(BASE_URL, archive.meta().get("base_url", BASE_URL), 1)
+    base_search_url = search_url_template.format(query=encoded_query)
     page_limit = max_pages if isinstance(max_pages, int) and max_pages > 0 else DEFAULT_MAX_PAGES
+    workers = detail_concurrency if isinstance(detail_concurrency, int) and detail_concurrency > 0 else DETAIL_CONCURRENCY
 
-    driver = create_driver(headless=headless)
-    session = requests.Session()
-    session.headers.update(HEADERS)
+    driver_pool = get_driver_pool(headless)
+    # Per-job cookies over the process-wide connection pools, so keep-alive carries across jobs.
+    session = new_session(HEADERS)
 
-    products: List[Dict[str, Any]] = []
+    pages_loaded = 0
+
+    def detail_progress(completed: int, discovered: int, listing_done: bool) -> None:
+        if listing_done:
+            notify(completed, discovered, "processing", f"{completed}/{discovered} ürün işlendi")
+        else:
+            notify(
+                completed,
+                discovered,
+                "processing",
+                f"{completed}/{discovered} ürün işlendi, arama sürüyor ({pages_loaded}. sayfa tarandı)",
+            )
+
+    history = get_search_history() if incremental and not replaying else None
+    previous_run: Dict[str, StoredListing] = history.load(query) if history is not None else {}
+    signals: Dict[str, Tuple[str, Optional[float]]] = {}
+    kept_rows: List[ResultRecord] = []
+    carried_forward = 0
+    # The pipeline emits each product's rows together, so only the current product's rows and a
+    # small batch of finished products are held before they go to the history store.
+    history_product: Optional[str] = None
+    history_product_rows: List[Dict[str, Any]] = []
+    history_batch: List[Tuple[str, StoredListing]] = []
+    history_stored: Set[str] = set()
+
+    def finish_history_product() -> None:
+        nonlocal history_product, history_product_rows
+        # Placeholder rows of failed products are not stored, so the next run fetches them again.
+        if history_product is not None and history_product_rows:
+            signal, stored_at = signals[history_product]
+            history_batch.append(
+                (history_product, StoredListing(signal, history_product_rows, stored_at or time.time()))
+            )
+            history_stored.add(history_product)
+        history_product, history_product_rows = None, []
+        if len(history_batch) >= HISTORY_WRITE_BATCH:
+            history.store(query, history_batch)
+            history_batch.clear()
+
+    def record_row(row: ResultRecord) -> None:
+        nonlocal history_product
+        product_id = str(row["Product ID"])
+        if product_id != history_product:
+            finish_history_product()
+            history_product = product_id
+        if not row.is_placeholder:
+            history_product_rows.append(row.to_dict())
+        if row_sink is not None:
+            row_sink(row)
+        else:
+            kept_rows.append(row)
+
+    trace = trace or NULL_TRACE
+    if archive is not None:
+        archive.set_meta(query=query, max_pages=page_limit, base_url=BASE_URL)
+    fetcher = ProductDetailFetcher(session, headless=headless, driver_pool=driver_pool, trace=trace, archive=archive)
+    pipeline = DetailPipeline(
+        fetcher, workers, on_progress=detail_progress, row_sink=record_row if history is not None else row_sink
+    )
     seen_ids: set[str] = set()
+    pipeline.start()
     try:
         notify(0, 0, "loading", "Arama sonuçları yükleniyor")
-        for page in range(1, page_limit + 1):
-            page_url = f"{base_search_url}&pi={page}"
-            notify(len(products), 0, "loading", f"{page}. sayfa yükleniyor")
-            driver.get(page_url)
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located(PAGE_READY_SELECTOR))
-            load_all_results(driver)
-            time.sleep(1.0)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            before_count = len(products)
-            page_products = collect_products_from_cards(soup, seen_ids)
-            if not page_products:
-                break
-            products.extend(page_products)
-            if page == 1:
-                for cookie in driver.get_cookies():
-                    session.cookies.set(cookie["name"], cookie["value"])
-            if len(page_products) < 24:
-                break
-    finally:
-        driver.quit()
+        page_urls = [f"{base_search_url}&pi={page}" for page in range(1, page_limit + 1)]
+        window = max(1, SEARCH_PAGE_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=window) as page_executor:
 
-    fetcher = ProductDetailFetcher(session, headless=headless)
-    rows: List[Dict[str, Any]] = []
-    total_products = len(products)
-    if total_products == 0:
-        notify(0, 0, "completed", "Hiç ürün bulunamadı")
-        return rows
-    notify(0, total_products, "processing", f"{total_products} ürün bulundu. Ayrıntılar getiriliyor")
-    try:
-        for index, product in enumerate(products, start=1):
-            detail_html = fetcher.fetch_page(product["product_url"])
-            parsed = parse_product_detail(detail_html or "")
-            general = parsed.get("general", {})
-            merchants = parsed.get("merchants", [])
-            if not merchants:
-                row = {
-                    "Product ID": product["product_id"],
-                    "Product Name": product["product_name"],
-                    "Product Code": general.get("product_code", "N/A"),
-                    "Category Name": general.get("category_name", "N/A"),
-                    "Category Hierarchy": general.get("category_hierarchy", "N/A"),
-                    "Category ID": product.get("category_id", "N/A"),
-                    "Brand": general.get("brand", "N/A"),
-                    "Product URL": product["product_url"],
-                    "Image URLs": general.get("images") or [product.get("image_url") or "N/A"],
-                    "Merchant Type": "N/A",
-                    "Merchant ID": "N/A",
-                    "Merchant Name": "N/A",
-                    "officialName": "N/A",
-                    "cityName": "N/A",
-                    "registeredEmailAddress": "N/A",
-                    "taxNumber": "N/A",
-                    "sellerLink": "N/A",
-                    "Price Text": "N/A",
-                    "Price Value": "N/A",
-                    "Currency": "N/A",
-                    "Listing ID": "N/A",
-                    "Stock": "N/A",
-                    "Fulfilment Type": "N/A",
-                    "isTyPlusEligible": "N/A",
-                }
-                if isinstance(row["Image URLs"], list):
-                    row["Image URLs"] = " | ".join([img for img in row["Image URLs"] if img]) or "N/A"
-                rows.append(row)
-                notify(index, total_products, "processing", f"{index}/{total_products} ürün işlendi")
-                continue
+            def submit_page(page_url: str) -> "Future[List[Dict[str, Any]]]":
+                return page_executor.submit(load_search_page, session, driver_pool, page_url, trace, archive)
 
-            for merchant in merchants:
-                enriched = enrich_merchant_with_seller(fetcher, merchant)
-                row = {
-                    "Product ID": product["product_id"],
-                    "Product Name": product["product_name"],
-                    "Product Code": general.get("product_code", "N/A"),
-                    "Category Name": general.get("category_name", "N/A"),
-                    "Category Hierarchy": general.get("category_hierarchy", "N/A"),
-                    "Category ID": product.get("category_id", "N/A"),
-                    "Brand": general.get("brand", "N/A"),
-                    "Product URL": product["product_url"],
-                    "Image URLs": general.get("images") or [product.get("image_url") or "N/A"],
-                }
-                row.update(enriched)
-                image_data = row["Image URLs"]
-                if isinstance(image_data, list):
-                    row["Image URLs"] = " | ".join([img for img in image_data if img]) or "N/A"
-                rows.append(row)
-            notify(index, total_products, "processing", f"{index}/{total_products} ürün işlendi")
+            # Page 1 decides whether the query has results at all. After each full page the next ones
+            # are kept loading up to the window, so a short page leaves at most that many wasted fetches.
+            pending: "deque[Future[List[Dict[str, Any]]]]" = deque([submit_page(page_urls[0])])
+            next_page = 1
+            try:
+                while pending:
+                    page_products = [
+                        product for product in pending.popleft().result() if product["product_id"] not in seen_ids
+                    ]
+                    if not page_products or pipeline.failed:
+                        break
+                    if len(page_products) >= SEARCH_PAGE_SIZE:
+                        while next_page < len(page_urls) and len(pending) < window:
+                            pending.append(submit_page(page_urls[next_page]))
+                            next_page += 1
+                    pages_loaded += 1
+                    for product in page_products:
+                        seen_ids.add(product["product_id"])
+                        if history is None:
+                            pipeline.submit(product)
+                            continue
+                        signal = listing_signal(product)
+                        previous = previous_run.get(product["product_id"])
+                        if previous is not None and previous.signal == signal and previous.rows:
+                            signals[product["product_id"]] = (signal, previous.fetched_at)
+                            pipeline.submit(product, records_from_rows(previous.rows))
+                            carried_forward += 1
+                        else:
+                            signals[product["product_id"]] = (signal, None)
+                            pipeline.submit(product)
+                    if len(page_products) < SEARCH_PAGE_SIZE:
+                        break
+            finally:
+                for future in pending:
+                    future.cancel()
     finally:
+        rows = pipeline.close()
         fetcher.close()
 
+    if history is not None:
+        rows = kept_rows
+        finish_history_product()
+        history.store(query, history_batch)
+        history.prune(query, history_stored)
+
+    total_products = pipeline.submitted
+    if total_products == 0:
+        notify(0, 0, "completed", "Hiç ürün bulunamadı")
+        return rows
+    if carried_forward:
+        notify(
+            total_products,
+            total_products,
+            "completed",
+            f"Arama tamamlandı ({total_products - carried_forward} ürün yenilendi, "
+            f"{carried_forward} ürün önceki çalışmadan aktarıldı)",
+        )
+        return rows
     notify(total_products, total_products, "completed", "Arama tamamlandı")
     return rows
 
 
-def export_to_excel(rows: List[Dict[str, Any]], output_path: str = "trendyol_products.xlsx") -> None:
+def export_to_excel(rows: List[Mapping[str, Any]], output_path: str = "trendyol_products.xlsx") -> None:
     if not rows:
         return
-    df = pd.DataFrame(rows)
-    if os.path.exists(output_path):
-        os.remove(output_path)
-    df.to_excel(output_path, index=False)
+    with EXPORT_SECONDS.time(format="xlsx"), XlsxResultWriter(output_path) as writer:
+        writer.write_many(rows)
 
 
 def main() -> None:
@@ -571,13 +1645,15 @@ def main() -> None:
         else:
             print(f"[{stage}] {message}")
 
-    rows = search_trendyol(query, progress_callback=cli_progress)
+    output_path = "trendyol_products.xlsx"
+    with XlsxResultWriter(output_path) as writer:
+        search_trendyol(query, progress_callback=cli_progress, row_sink=writer.write)
     if last_percent is not None:
         print()
-    if rows:
-        export_to_excel(rows)
-        print(f"{len(rows)} satır Excel'e kaydedildi.")
+    if writer.rows_written:
+        print(f"{writer.rows_written} satır Excel'e kaydedildi.")
     else:
+        os.remove(output_path)
         print("Ürün bulunamadı veya veri alınamadı.")
 
 